@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import base64
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+from app.api.responses import json_response
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def clamp_limit(limit: int | None) -> int:
+    if limit is None:
+        return DEFAULT_LIMIT
+    if limit < 1:
+        raise HTTPException(status_code=422, detail="limit must be at least 1")
+    return min(limit, MAX_LIMIT)
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        ts, id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), uuid.UUID(id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: str | None, allowed: list[str]) -> list[str]:
+    if not fields:
+        return list(allowed)
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    if not wanted:
+        raise HTTPException(status_code=400, detail="No fields requested")
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return wanted
+
+
+def page_response(request: Request, items: list[dict], next_cursor: str | None) -> Response:
+    """A page as a JSON array; the cursor for the next page (if any) goes in a response header."""
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return json_response(request, items, headers=headers)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional: without it only gzip is offered
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def dumps(obj: Any) -> bytes:
+    """orjson handles datetime/UUID natively and skips the jsonable_encoder walk over large dicts."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick zstd or gzip from an Accept-Encoding header (q=0 excluded), preferring zstd on ties."""
+    offered: dict[str, float] = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            offered[name] = q
+    star = offered.get("*", 0.0)
+    candidates = (["zstd"] if zstandard is not None else []) + ["gzip"]
+    scored = [(offered.get(c, star), c) for c in candidates]
+    q, best = max(scored, key=lambda s: s[0])
+    return best if q > 0 else None
+
+
+def compress(body: bytes, encoding: str | None) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def _encoding_for(request: Request, size: int) -> str | None:
+    if size < settings.response_compress_min_bytes:
+        return None
+    return negotiate_encoding(request.headers.get("accept-encoding"))
+
+
+def _headers(encoding: str | None, extra: dict | None = None) -> dict:
+    headers = {"Vary": "Accept-Encoding", **(extra or {})}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+def json_response(request: Request, obj: Any, status_code: int = 200, headers: dict | None = None) -> Response:
+    body = dumps(obj)
+    encoding = _encoding_for(request, len(body))
+    return Response(
+        content=compress(body, encoding),
+        status_code=status_code,
+        media_type="application/json",
+        headers=_headers(encoding, headers),
+    )
+
+
+class BytesLRU:
+    """Thread-safe LRU of encoded response bodies, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> bytes | None:
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+_immutable_cache = BytesLRU(settings.response_cache_max_bytes)
+
+
+def cached_json_response(request: Request, key: str, build) -> Response:
+    """
+    Response for a resource that never changes once written (e.g. a test plan by id): the serialized and
+    compressed bytes are cached per encoding, and `key` doubles as a (weak, since it covers every encoding)
+    ETag so clients can revalidate with If-None-Match for a bodyless 304. `build()` returns the object and
+    is only called on a cache miss.
+    """
+    etag = f'W/"{key}"'
+    if_none_match = [t.strip().removeprefix("W/") for t in (request.headers.get("if-none-match") or "").split(",")]
+    if f'"{key}"' in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    body = _immutable_cache.get((key, encoding))
+    if body is None:
+        raw = _immutable_cache.get((key, None))
+        if raw is None:
+            raw = dumps(build())
+            _immutable_cache.put((key, None), raw)
+        if encoding and len(raw) < settings.response_compress_min_bytes:
+            encoding = None
+        body = raw
+        if encoding:
+            body = compress(raw, encoding)
+            _immutable_cache.put((key, encoding), body)
+    return Response(content=body, media_type="application/json", headers=_headers(encoding, {"ETag": etag}))
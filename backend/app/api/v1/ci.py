@@ -1,32 +1,37 @@
 from __future__ import annotations
 
-import os
-import httpx
 from fastapi import APIRouter, HTTPException
 
+from app.services.ci_dispatch import CIDispatchError, dispatcher, github_config
+
 router = APIRouter()
 
 @router.post("/projects/{project_id}/ci/run")
-def run_ci(project_id: str):
-    token = os.getenv("GH_WORKFLOW_TOKEN")
-    owner = os.getenv("GH_REPO_OWNER")
-    repo = os.getenv("GH_REPO_NAME")
-    workflow = os.getenv("GH_WORKFLOW_FILE", "playwright-api-tests.yml")
-    ref = os.getenv("GH_WORKFLOW_REF", "main")
-
-    if not token or not owner or not repo:
-        raise HTTPException(status_code=500, detail="Missing GH_* env vars (token/owner/repo)")
+async def run_ci(project_id: str):
+    try:
+        cfg = github_config()
+        result = await dispatcher.dispatch(project_id, cfg)
+    except CIDispatchError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-    url = f"https://api.github.com/repos/{owner}/{repo}/actions/workflows/{workflow}/dispatches"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
+    return {
+        "ok": True,
+        "dispatched": True,
+        "coalesced": result["coalesced"],
+        "dispatch_id": result["dispatch_id"],
+        "dispatched_at": result["dispatched_at"],
+        "workflow": cfg["workflow"],
+        "ref": cfg["ref"],
     }
-    payload = {"ref": ref}
 
-    r = httpx.post(url, headers=headers, json=payload, timeout=20.0)
-    if r.status_code not in (204, 201):
-        raise HTTPException(status_code=500, detail=f"GitHub dispatch failed: {r.status_code} {r.text}")
+@router.get("/projects/{project_id}/ci/status")
+async def ci_status(project_id: str):
+    try:
+        cfg = github_config()
+        status = await dispatcher.status(project_id, cfg)
+    except CIDispatchError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-    return {"ok": True, "dispatched": True, "workflow": workflow, "ref": ref}
\ No newline at end of file
+    if status is None:
+        raise HTTPException(status_code=404, detail="No CI run dispatched for this project")
+    return {"workflow": cfg["workflow"], "ref": cfg["ref"], **status}
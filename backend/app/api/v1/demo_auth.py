@@ -1,32 +1,26 @@
 from __future__ import annotations
 
 import re
-import time
-import secrets
-from typing import Dict
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+from app.services.demo_auth_store import AuthStoreFull, get_auth_store
+
 router = APIRouter()
 
-# In-memory demo store (good enough for MVP/CI)
-_USERS: Dict[str, dict] = {}          # email -> {password, profile}
-_TOKENS: Dict[str, str] = {}          # token -> email
-_LOGIN_ATTEMPTS: Dict[str, list] = {} # ip -> [timestamps]
+# Users (email -> {password, profile}), tokens and login attempts live in a pluggable store:
+# in-process by default, Redis when the API runs as several processes (DEMO_AUTH_BACKEND=redis).
 
 
 def _is_valid_email(email: str) -> bool:
     return bool(re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email))
 
 
-def _rate_limit(ip: str, limit: int = 5, window_s: int = 60) -> None:
-    now = time.time()
-    arr = _LOGIN_ATTEMPTS.setdefault(ip, [])
-    arr[:] = [t for t in arr if now - t <= window_s]
-    if len(arr) >= limit:
+def _rate_limit(ip: str) -> None:
+    if not get_auth_store().allow_attempt(ip, settings.demo_auth_login_limit, settings.demo_auth_login_window_s):
         raise HTTPException(status_code=429, detail="Too many login attempts")
-    arr.append(now)
 
 
 def _require_token(request: Request) -> str:
@@ -34,7 +28,7 @@ def _require_token(request: Request) -> str:
     if not auth.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid token")
     token = auth.split(" ", 1)[1].strip()
-    email = _TOKENS.get(token)
+    email = get_auth_store().token_email(token)
     if not email:
         raise HTTPException(status_code=401, detail="Missing or invalid token")
     return email
@@ -57,13 +51,15 @@ def register(body: AuthBody):
         raise HTTPException(status_code=400, detail="Invalid email")
     if len(body.password) < 8:
         raise HTTPException(status_code=400, detail="Password must be 8+ chars")
-    if body.email in _USERS:
+    try:
+        created = get_auth_store().create_user(body.email, {
+            "password": body.password,
+            "profile": {"email": body.email, "name": "", "bio": "", "avatarUrl": ""},
+        })
+    except AuthStoreFull:
+        raise HTTPException(status_code=503, detail="User limit reached")
+    if not created:
         raise HTTPException(status_code=409, detail="User already exists")
-
-    _USERS[body.email] = {
-        "password": body.password,
-        "profile": {"email": body.email, "name": "", "bio": "", "avatarUrl": ""},
-    }
     return {"ok": True}
 
 
@@ -71,31 +67,41 @@ def register(body: AuthBody):
 def login(body: AuthBody, request: Request):
     ip = request.client.host if request.client else "unknown"
 
-    u = _USERS.get(body.email)
+    store = get_auth_store()
+    u = store.get_user(body.email)
     if not u or u["password"] != body.password:
         _rate_limit(ip)  # count only failed attempts
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # successful login shouldn't contribute to rate limit
-    _LOGIN_ATTEMPTS.pop(ip, None)
+    store.reset_attempts(ip, settings.demo_auth_login_window_s)
 
-    token = secrets.token_urlsafe(24)
-    _TOKENS[token] = body.email
-    return {"token": token}
+    try:
+        return {"token": store.issue_token(body.email)}
+    except AuthStoreFull:
+        raise HTTPException(status_code=503, detail="Too many active sessions")
 
 
 @router.get("/me")
 def me(request: Request):
     email = _require_token(request)
-    return _USERS[email]["profile"]
+    u = get_auth_store().get_user(email)
+    if not u:
+        raise HTTPException(status_code=401, detail="Missing or invalid token")
+    return u["profile"]
 
 
 @router.patch("/me")
 def patch_me(body: ProfilePatch, request: Request):
     email = _require_token(request)
-    prof = _USERS[email]["profile"]
+    store = get_auth_store()
+    u = store.get_user(email)
+    if not u:
+        raise HTTPException(status_code=401, detail="Missing or invalid token")
+    prof = u["profile"]
     for k, v in body.model_dump(exclude_none=True).items():
         prof[k] = v
+    store.save_user(email, u)
     return prof
 
 
@@ -105,5 +111,5 @@ def logout(request: Request):
     # invalidate token used
     auth = request.headers.get("authorization", "")
     token = auth.split(" ", 1)[1].strip()
-    _TOKENS.pop(token, None)
+    get_auth_store().revoke_token(token)
     return {"ok": True}
\ No newline at end of file
@@ -1,18 +1,103 @@
+import json
+
 from fastapi import APIRouter
-from celery.result import AsyncResult
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
 from app.tasks.celery_app import celery
+from app.tasks.queues import queue_metrics
+from app.core.redis_client import get_async_redis, get_redis
+from app.services.progress import TERMINAL_STATES, channel, decode_event, snapshot_key
 
 router = APIRouter()
 
-@router.get("/{job_id}")
-def job_status(job_id: str):
-    r = AsyncResult(job_id, app=celery)
+MAX_BATCH = 500
+KEEPALIVE_S = 15.0
+
+
+class JobIdsBody(BaseModel):
+    job_ids: list[str] = Field(min_length=1, max_length=MAX_BATCH)
+
+
+def _status(job_id: str, meta_payload: bytes | None, progress_payload: bytes | None) -> dict:
+    # Celery result meta is authoritative for the state; the progress snapshot adds detail
+    # (and reports STARTED/PROGRESS before Celery has stored anything).
+    meta = celery.backend.decode_result(meta_payload) if meta_payload else None
+    progress = decode_event(progress_payload)
+
+    state = meta["status"] if meta else (progress["state"] if progress else "PENDING")
     data = {
         "job_id": job_id,
-        "state": r.state,
+        "state": state,
     }
-    if r.state == "FAILURE":
-        data["error"] = str(r.result)
-    if r.state == "SUCCESS":
-        data["result"] = r.result
+    if state == "FAILURE" and meta:
+        data["error"] = str(meta["result"])
+    if state == "SUCCESS" and meta:
+        data["result"] = meta["result"]
+    if progress:
+        data["progress"] = progress
     return data
+
+
+def _statuses(job_ids: list[str]) -> list[dict]:
+    # One round trip for any number of jobs instead of an AsyncResult lookup per job.
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.mget([celery.backend.get_key_for_task(j) for j in job_ids])
+    pipe.mget([snapshot_key(j) for j in job_ids])
+    metas, snapshots = pipe.execute()
+    return [_status(j, m, p) for j, m, p in zip(job_ids, metas, snapshots)]
+
+
+def _sse(event: dict) -> bytes:
+    return f"data: {json.dumps(event, default=str)}\n\n".encode("utf-8")
+
+
+@router.get("/queues")
+def queues():
+    """Per-queue backlog depth and recent queue wait times (enqueue -> start)."""
+    return {"queues": queue_metrics()}
+
+
+@router.post("/status")
+def batch_job_status(body: JobIdsBody):
+    return {"jobs": _statuses(body.job_ids)}
+
+
+@router.get("/{job_id}")
+def job_status(job_id: str):
+    return _statuses([job_id])[0]
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: the current status first, then every progress event until the job finishes."""
+    async def stream():
+        r = get_async_redis()
+        pubsub = r.pubsub()
+        # Subscribe before reading the current state so no event falls in between.
+        await pubsub.subscribe(channel(job_id))
+        try:
+            meta, progress = await r.mget([celery.backend.get_key_for_task(job_id), snapshot_key(job_id)])
+            current = _status(job_id, meta, progress)
+            yield _sse(current)
+            if current["state"] in TERMINAL_STATES:
+                return
+
+            while True:
+                msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=KEEPALIVE_S)
+                if msg is None:
+                    yield b": keepalive\n\n"
+                    continue
+                event = decode_event(msg["data"])
+                yield _sse(event)
+                if event and event.get("state") in TERMINAL_STATES:
+                    return
+        finally:
+            await pubsub.unsubscribe(channel(job_id))
+            await pubsub.aclose()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
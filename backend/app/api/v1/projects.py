@@ -1,17 +1,20 @@
 import uuid
 import io
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, tuple_
 from fastapi.responses import StreamingResponse
 from app.services.playwright_api_gen import generate_playwright_api_tests_zip
 from fastapi.responses import Response
 
 from app.db.session import get_db
-from app.db.models import Project, Document, Chunk, TestPlan
-from app.tasks.ingest_tasks import ingest_document_task
-from app.tasks.plan_tasks import generate_test_plan_task
+from app.api.pagination import clamp_limit, decode_cursor, encode_cursor, page_response, parse_fields
+from app.api.responses import cached_json_response, json_response
+from app.db.models import Project, Document, Chunk, TestPlan, TestCase
+from app.tasks.celery_app import enqueue
+from app.tasks.queues import INGEST_TASK, PLAN_TASK
 from app.services.search import semantic_search
+from app.services.uploads import store_upload
 
 router = APIRouter()
 
@@ -26,10 +29,33 @@ def create_project(payload: dict, db: Session = Depends(get_db)):
     db.refresh(proj)
     return {"id": str(proj.id), "name": proj.name, "created_at": proj.created_at}
 
+PROJECT_FIELDS = ["id", "name", "created_at"]
+DOCUMENT_FIELDS = ["id", "filename", "content_type", "status", "created_at"]
+
+def _keyset_page(
+    request: Request, db: Session, model, where: list, fields: list[str], limit: int, cursor: str | None
+):
+    # Select only the requested columns plus the (created_at, id) sort key, newest first.
+    cols = [getattr(model, f) for f in fields if f not in ("id", "created_at")]
+    stmt = select(model.id, model.created_at, *cols).where(*where)
+    if cursor:
+        c_created, c_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(model.created_at, model.id) < (c_created, c_id))
+    rows = db.execute(stmt.order_by(desc(model.created_at), desc(model.id)).limit(limit)).all()
+
+    items = [{f: (str(r.id) if f == "id" else getattr(r, f)) for f in fields} for r in rows]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if len(rows) == limit else None
+    return page_response(request, items, next_cursor)
+
 @router.get("")
-def list_projects(db: Session = Depends(get_db)):
-    items = db.execute(select(Project).order_by(desc(Project.created_at))).scalars().all()
-    return [{"id": str(p.id), "name": p.name, "created_at": p.created_at} for p in items]
+def list_projects(
+    request: Request,
+    limit: int = 100,
+    cursor: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+):
+    return _keyset_page(request, db, Project, [], parse_fields(fields, PROJECT_FIELDS), clamp_limit(limit), cursor)
 
 @router.post("/{project_id}/documents")
 async def upload_document(project_id: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
@@ -49,43 +75,49 @@ async def upload_document(project_id: str, file: UploadFile = File(...), db: Ses
         content_type=file.content_type or "application/octet-stream",
         status="uploaded",
     )
-    # store raw bytes in doc meta for now (MVP). Later: object storage.
-    # Keeping MVP simple: store in memory in task payload (Redis).
+    # Raw bytes wait in Redis under the document id (MVP; later: object storage); the task payload only
+    # carries the id, so retries do not re-send the file.
     db.add(doc)
     db.commit()
     db.refresh(doc)
 
-    job = ingest_document_task.delay(str(doc.id), data, doc.content_type, doc.filename)
+    store_upload(str(doc.id), data)
+    job = enqueue(INGEST_TASK, str(doc.id), None, doc.content_type, doc.filename)
     doc.status = "ingesting"
     db.commit()
 
     return {"document_id": str(doc.id), "job_id": job.id, "status": doc.status}
 
 @router.get("/{project_id}/documents")
-def list_documents(project_id: str, db: Session = Depends(get_db)):
+def list_documents(
+    request: Request,
+    project_id: str,
+    limit: int = 100,
+    cursor: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+):
     try:
         pid = uuid.UUID(project_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid project_id")
 
-    docs = db.execute(select(Document).where(Document.project_id == pid).order_by(desc(Document.created_at))).scalars().all()
-    return [
-        {"id": str(d.id), "filename": d.filename, "content_type": d.content_type, "status": d.status, "created_at": d.created_at}
-        for d in docs
-    ]
+    return _keyset_page(
+        request, db, Document, [Document.project_id == pid], parse_fields(fields, DOCUMENT_FIELDS), clamp_limit(limit), cursor
+    )
 
 @router.get("/{project_id}/search")
-def search(project_id: str, q: str, db: Session = Depends(get_db)):
+def search(request: Request, project_id: str, q: str, db: Session = Depends(get_db)):
     try:
         pid = uuid.UUID(project_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid project_id")
 
     results = semantic_search(db, pid, q)
-    return {"query": q, "results": results}
+    return json_response(request, {"query": q, "results": results})
 
 @router.post("/{project_id}/generate/test-plan")
-def generate_test_plan(project_id: str, db: Session = Depends(get_db)):
+def generate_test_plan(project_id: str, incremental: bool = False, db: Session = Depends(get_db)):
     try:
         pid = uuid.UUID(project_id)
     except ValueError:
@@ -95,24 +127,136 @@ def generate_test_plan(project_id: str, db: Session = Depends(get_db)):
     if not proj:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    job = generate_test_plan_task.delay(str(pid))
+    job = enqueue(PLAN_TASK, str(pid), incremental=incremental)
     return {"job_id": job.id}
 
 @router.get("/{project_id}/test-plans/latest")
-def latest_test_plan(project_id: str, db: Session = Depends(get_db)):
+def latest_test_plan(request: Request, project_id: str, db: Session = Depends(get_db)):
     try:
         pid = uuid.UUID(project_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid project_id")
 
-    plan = db.execute(
-        select(TestPlan).where(TestPlan.project_id == pid).order_by(desc(TestPlan.created_at)).limit(1)
-    ).scalars().first()
+    # Index-only lookup of the id; plan_json is loaded only when the serialized plan is not cached.
+    plan_id = db.execute(
+        select(TestPlan.id).where(TestPlan.project_id == pid).order_by(desc(TestPlan.created_at)).limit(1)
+    ).scalar()
 
-    if not plan:
+    if not plan_id:
         raise HTTPException(status_code=404, detail="No test plans yet")
 
-    return {"id": str(plan.id), "job_id": plan.job_id, "created_at": plan.created_at, "plan": plan.plan_json}
+    def build() -> dict:
+        plan = db.get(TestPlan, plan_id)
+        return {
+            "id": str(plan.id),
+            "job_id": plan.job_id,
+            "created_at": plan.created_at,
+            "version": plan.version,
+            "base_plan_id": str(plan.base_plan_id) if plan.base_plan_id else None,
+            "diff": plan.diff,
+            "plan": plan.plan_json,
+        }
+
+    # Plans are never modified after they are written, so the bytes can be cached by id.
+    return cached_json_response(request, f"plan-{plan_id}", build)
+
+def _list_test_cases(
+    db: Session,
+    plan_id: uuid.UUID,
+    priority: str | None,
+    type: str | None,
+    tag: str | None,
+    after: int | None,
+    limit: int,
+    full: bool,
+) -> dict:
+    limit = max(1, min(limit, 500))
+    stmt = select(TestCase).where(TestCase.plan_id == plan_id)
+    if priority:
+        stmt = stmt.where(TestCase.priority == priority.upper())
+    if type:
+        stmt = stmt.where(TestCase.type == type.lower())
+    if tag:
+        stmt = stmt.where(TestCase.tags.contains([tag]))
+    if after is not None:
+        stmt = stmt.where(TestCase.position > after)
+    stmt = stmt.order_by(TestCase.position).limit(limit)
+    rows = db.execute(stmt).scalars().all()
+    # Plans saved before test_cases existed have no rows yet; materialize them from plan_json on first read.
+    if not rows:
+        from app.services.test_plan import backfill_test_cases  # keeps plan generation out of API startup
+
+        if backfill_test_cases(db, plan_id):
+            rows = db.execute(stmt).scalars().all()
+
+    items = []
+    for r in rows:
+        item = {
+            "id": r.test_id,
+            "priority": r.priority,
+            "type": r.type,
+            "title": r.title,
+            "endpoint": r.endpoint,
+            "tags": r.tags,
+            "sources": r.sources,
+        }
+        if full:
+            item["test"] = r.body
+        items.append(item)
+
+    next_cursor = rows[-1].position if len(rows) == limit else None
+    return {"plan_id": str(plan_id), "items": items, "next_cursor": next_cursor}
+
+@router.get("/{project_id}/test-plans/latest/tests")
+def latest_test_plan_tests(
+    request: Request,
+    project_id: str,
+    priority: str | None = None,
+    type: str | None = None,
+    tag: str | None = None,
+    after: int | None = None,
+    limit: int = 50,
+    full: bool = False,
+    db: Session = Depends(get_db),
+):
+    try:
+        pid = uuid.UUID(project_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid project_id")
+
+    # Only the id is selected, so plan_json is never loaded.
+    plan_id = db.execute(
+        select(TestPlan.id).where(TestPlan.project_id == pid).order_by(desc(TestPlan.created_at)).limit(1)
+    ).scalar()
+    if not plan_id:
+        raise HTTPException(status_code=404, detail="No test plans yet")
+
+    return json_response(request, _list_test_cases(db, plan_id, priority, type, tag, after, limit, full))
+
+@router.get("/{project_id}/test-plans/{plan_id}/tests")
+def test_plan_tests(
+    request: Request,
+    project_id: str,
+    plan_id: str,
+    priority: str | None = None,
+    type: str | None = None,
+    tag: str | None = None,
+    after: int | None = None,
+    limit: int = 50,
+    full: bool = False,
+    db: Session = Depends(get_db),
+):
+    try:
+        pid = uuid.UUID(project_id)
+        plid = uuid.UUID(plan_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid project_id or plan_id")
+
+    found = db.execute(select(TestPlan.id).where(TestPlan.id == plid, TestPlan.project_id == pid)).scalar()
+    if not found:
+        raise HTTPException(status_code=404, detail="Test plan not found")
+
+    return json_response(request, _list_test_cases(db, plid, priority, type, tag, after, limit, full))
 
 @router.get("/{project_id}/test-plans/latest/playwright-api.zip")
 def download_latest_playwright_api_zip(project_id: str, db: Session = Depends(get_db)):
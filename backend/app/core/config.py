@@ -9,14 +9,67 @@ class Settings(BaseSettings):
 
     database_url: str
     redis_url: str
+    # Schema is managed by Alembic (`alembic upgrade head`). Dev-only shortcut: create missing tables at API startup.
+    db_create_all: bool = False
 
     openai_api_key: str | None = None
     openai_chat_model: str = "gpt-5.2"
     openai_embed_model: str = "text-embedding-3-small"
 
     embedding_dim: int = 1536
-    chunk_size: int = 1200
+    chunk_size: int = 1200  # "chars" strategy only
     chunk_overlap: int = 200
     rag_top_k: int = 8
 
+    # Chunking strategy per file extension or content type: "markdown" (split on headings/lists/tables),
+    # "tokens" (paragraph packing, no heading parsing) or "chars" (legacy CHUNK_SIZE/CHUNK_OVERLAP).
+    chunk_strategies: dict[str, str] = {
+        ".md": "markdown",
+        ".markdown": "markdown",
+        ".txt": "markdown",
+        "text/markdown": "markdown",
+        "text/plain": "markdown",
+    }
+    chunk_default_strategy: str = "tokens"
+    chunk_max_tokens: int = 512
+    chunk_overlap_tokens: int = 32
+    # Embedding requests are packed up to this many tokens / inputs.
+    embed_batch_max_tokens: int = 50_000
+    embed_batch_max_inputs: int = 256
+
+    # JSON responses at least this big are gzip/zstd compressed when the client accepts it.
+    response_compress_min_bytes: int = 1024
+    # Per-process cache of serialized (and compressed) immutable responses, e.g. test plans by id.
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Set after `python -m app.db.partitioning enable`: projects reaching chunk_partition_min_rows chunks
+    # are moved to their own partition (with its own HNSW index) by a maintenance task.
+    chunk_partitioning: bool = False
+    chunk_partition_min_rows: int = 50_000
+
+    # Max jobs (ingest + plan) running at once for a single project, across all workers.
+    project_max_concurrent_jobs: int = 4
+    # A job finding its project at capacity retries with backoff (5s doubling up to 60s); after this many
+    # retries (~30 min) it fails.
+    project_slot_max_retries: int = 35
+    # Uploaded files wait in Redis for their ingest job this long; the job payload only carries the key.
+    upload_ttl_s: int = 24 * 3600
+
+    # Demo auth service (/api/auth/*, /api/me). Use "redis" when running more than one API process.
+    demo_auth_backend: str = "memory"
+    demo_auth_token_ttl_s: int = 3600
+    demo_auth_user_ttl_s: int = 7 * 24 * 3600  # redis backend
+    demo_auth_max_users: int = 10_000  # memory backend caps (register/login get 503 when full)
+    demo_auth_max_tokens: int = 100_000
+    demo_auth_max_rate_keys: int = 100_000
+    demo_auth_login_limit: int = 5
+    demo_auth_login_window_s: int = 60
+
+    # Observability: Prometheus histograms (/metrics) and OpenTelemetry tracing.
+    metrics_enabled: bool = True
+    tracing_enabled: bool = False
+    otel_exporter_otlp_endpoint: str | None = None  # e.g. http://otel-collector:4318; stdout if unset
+    otel_service_name: str = "ai-test-copilot"
+    worker_metrics_port: int = 9808
+
 settings = Settings()
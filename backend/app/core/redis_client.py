@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+# One connection pool per process, shared by progress events, queue metrics, job limits and demo auth.
+_redis: redis.Redis | None = None
+_async_redis: aioredis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.redis_url)
+    return _redis
+
+
+def get_async_redis() -> aioredis.Redis:
+    global _async_redis
+    if _async_redis is None:
+        _async_redis = aioredis.Redis.from_url(settings.redis_url)
+    return _async_redis
@@ -0,0 +1,215 @@
+"""
+Tracing + Prometheus metrics for the API and the Celery workers.
+
+- `span("stage")` times a pipeline stage into the `aitc_stage_seconds` histogram and, when tracing is
+  enabled, opens an OpenTelemetry span. With both disabled it returns a shared no-op context manager.
+- Trace context travels API -> Celery in the task message headers (W3C `traceparent`), so a worker's
+  spans join the trace of the request that enqueued the job.
+- Spans go to an OTLP/HTTP collector when OTEL_EXPORTER_OTLP_ENDPOINT is set, else to stdout
+  (a local stand-in for a collector).
+- In multi-process deployments (uvicorn workers, Celery prefork) set PROMETHEUS_MULTIPROC_DIR so
+  /metrics aggregates every process.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.core.config import settings
+
+_METRICS = settings.metrics_enabled
+_TRACING = settings.tracing_enabled
+_NOOP = nullcontext()
+
+STAGE_SECONDS = Histogram(
+    "aitc_stage_seconds",
+    "Latency of pipeline stages (search, OpenAI calls, JSON extraction, DB writes, ...)",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+HTTP_SECONDS = Histogram(
+    "aitc_http_request_seconds",
+    "API request latency",
+    ["method", "route", "status"],
+)
+OPENAI_TOKENS = Histogram(
+    "aitc_openai_tokens",
+    "Tokens per OpenAI call",
+    ["call", "kind"],
+    buckets=(16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072),
+)
+BATCH_SIZE = Histogram(
+    "aitc_batch_size",
+    "Items per batch (embedding inputs, inserted chunks, retrieved contexts)",
+    ["stage"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048),
+)
+
+_tracer = None
+
+
+def _get_tracer():
+    global _tracer
+    if _tracer is None:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+        if settings.otel_exporter_otlp_endpoint:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            exporter = OTLPSpanExporter(endpoint=settings.otel_exporter_otlp_endpoint.rstrip("/") + "/v1/traces")
+        else:
+            exporter = ConsoleSpanExporter()
+
+        provider = TracerProvider(resource=Resource.create({"service.name": settings.otel_service_name}))
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        _tracer = trace.get_tracer("app")
+    return _tracer
+
+
+@contextmanager
+def _span(stage: str, attrs: dict[str, Any]) -> Iterator[Any]:
+    start = time.perf_counter()
+    try:
+        if _TRACING:
+            with _get_tracer().start_as_current_span(stage, attributes=attrs) as s:
+                yield s
+        else:
+            yield None
+    finally:
+        if _METRICS:
+            STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def span(stage: str, **attrs: Any):
+    if not (_METRICS or _TRACING):
+        return _NOOP
+    return _span(stage, attrs)
+
+
+def observe_batch(stage: str, n: int) -> None:
+    if _METRICS:
+        BATCH_SIZE.labels(stage).observe(n)
+
+
+def observe_tokens(call: str, usage: Any) -> None:
+    """Accepts both Responses (input/output_tokens) and Embeddings (prompt_tokens) usage objects."""
+    if not _METRICS or usage is None:
+        return
+    for kind in ("input_tokens", "output_tokens", "prompt_tokens"):
+        n = getattr(usage, kind, None)
+        if n is not None:
+            OPENAI_TOKENS.labels(call, kind).observe(n)
+
+
+# --- Context propagation -------------------------------------------------------------------------
+
+def inject_context(carrier: dict) -> None:
+    if _TRACING:
+        from opentelemetry import propagate
+
+        propagate.inject(carrier)
+
+
+def start_remote_span(name: str, carrier: Any, kind: str = "internal"):
+    """
+    Start a span whose parent comes from `carrier` (message/request headers). `kind` is a SpanKind name:
+    "server" for HTTP entry spans, "consumer" for tasks taken off a queue. Returns (span, token) or None.
+    """
+    if not _TRACING:
+        return None
+    from opentelemetry import context, propagate, trace
+
+    ctx = propagate.extract(carrier)
+    s = _get_tracer().start_span(name, context=ctx, kind=trace.SpanKind[kind.upper()])
+    token = context.attach(trace.set_span_in_context(s, ctx))
+    return s, token
+
+
+def end_remote_span(handle, error: BaseException | None = None) -> None:
+    if not handle:
+        return
+    from opentelemetry import context
+    from opentelemetry.trace import Status, StatusCode
+
+    s, token = handle
+    if error is not None:
+        s.record_exception(error)
+        s.set_status(Status(StatusCode.ERROR))
+    s.end()
+    context.detach(token)
+
+
+# --- HTTP ----------------------------------------------------------------------------------------
+
+def _route_template(scope) -> str:
+    # Label by route template, not raw path, to keep label cardinality bounded.
+    if "route" not in scope:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    for name, value in (scope.get("path_params") or {}).items():
+        segments = [f"{{{name}}}" if seg == str(value) else seg for seg in segments]
+    return "/".join(segments)
+
+
+class TelemetryMiddleware:
+    """ASGI middleware: request latency histogram + server span continuing the caller's trace."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (_METRICS or _TRACING):
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers") or []}
+        handle = start_remote_span(f"{scope['method']} {scope['path']}", carrier, kind="server")
+        start = time.perf_counter()
+        error = None
+        try:
+            await self.app(scope, receive, _send)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            route = _route_template(scope)
+            if _METRICS:
+                HTTP_SECONDS.labels(scope["method"], route, str(status["code"])).observe(time.perf_counter() - start)
+            if handle:
+                handle[0].set_attribute("http.route", route)
+                handle[0].set_attribute("http.status_code", status["code"])
+            end_remote_span(handle, error)
+
+
+def metrics_registry() -> CollectorRegistry | None:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return None
+
+
+def render_metrics() -> tuple[bytes, str]:
+    registry = metrics_registry()
+    return (generate_latest(registry) if registry else generate_latest()), CONTENT_TYPE_LATEST
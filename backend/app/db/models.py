@@ -1,9 +1,9 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String, Text, DateTime, Integer, JSON
+from sqlalchemy import ForeignKey, String, Text, DateTime, Integer, JSON, Index, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from pgvector.sqlalchemy import Vector
 from app.core.config import settings
@@ -13,6 +13,10 @@ class Base(DeclarativeBase):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Keyset pagination order for list_projects.
+        Index("ix_projects_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -22,6 +26,10 @@ class Project(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset pagination order for list_documents.
+        Index("ix_documents_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     project_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("projects.id"), index=True)
@@ -47,15 +55,59 @@ class Chunk(Base):
     embedding: Mapped[list[float]] = mapped_column(Vector(settings.embedding_dim))
 
     meta: Mapped[dict] = mapped_column(JSON, default=dict)
+    # sha256 of the chunk text; lets incremental plan regeneration detect unchanged chunks across re-ingests.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     document: Mapped["Document"] = relationship(back_populates="chunks")
 
 class TestPlan(Base):
     __tablename__ = "test_plans"
+    __table_args__ = (
+        # Serves the "latest plan for project" lookup as an index-only scan.
+        Index(
+            "ix_test_plans_project_id_created_at",
+            "project_id",
+            text("created_at DESC"),
+            postgresql_include=["id"],
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    project_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), index=True)
+    # Covered by ix_test_plans_project_id_created_at (project_id is its leading column).
+    project_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     job_id: Mapped[str] = mapped_column(String(100), index=True)
     plan_json: Mapped[dict] = mapped_column(JSON)
+
+    # Versioning for incremental regeneration: each plan points at the plan it was derived from.
+    version: Mapped[int] = mapped_column(Integer, default=1)
+    base_plan_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    diff: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Chunk snapshot at generation time: {"hashes": [every chunk content_hash], "cited": {chunk_id: hash}} for
+    # the chunks the plan's tests cite. Only the latest plan of a project keeps it (older versions are cleared
+    # on save), and only incremental regeneration reads it, so it is not loaded by default.
+    source_hashes: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True)
+
+class TestCase(Base):
+    """One row per test in a plan, so clients can page/filter tests without loading plan_json."""
+    __tablename__ = "test_cases"
+    __table_args__ = (
+        Index("ix_test_cases_plan_id_position", "plan_id", "position"),
+        Index("ix_test_cases_plan_id_priority_type", "plan_id", "priority", "type"),
+        Index("ix_test_cases_tags", "tags", postgresql_using="gin"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    plan_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("test_plans.id", ondelete="CASCADE"))
+    project_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), index=True)
+    position: Mapped[int] = mapped_column(Integer)
+
+    test_id: Mapped[str] = mapped_column(String(50))
+    priority: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    type: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    title: Mapped[str] = mapped_column(Text, default="")
+    endpoint: Mapped[str | None] = mapped_column(String(300), nullable=True)
+    tags: Mapped[list] = mapped_column(JSONB, default=list)
+    sources: Mapped[list] = mapped_column(JSONB, default=list)
+    body: Mapped[dict] = mapped_column(JSONB, default=dict)
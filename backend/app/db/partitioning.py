@@ -0,0 +1,384 @@
+"""
+Optional LIST partitioning of `chunks` by project_id.
+
+Layout once enabled:
+- `chunks` is a partitioned parent; the ORM and all queries keep using it unchanged.
+- `chunks_default` (the original table) holds every project without its own partition.
+- Large projects are promoted to a dedicated `chunks_p_<project hex>` partition with its own HNSW index,
+  so their vector scans, re-ingest deletes and vacuum never touch other tenants, and deleting the project
+  is a partition drop.
+
+Hash partitioning would spread every tenant over a fixed set of partitions; list + default keeps small
+tenants cheap and gives large ones an isolated, right-sized index, which is what we want here.
+
+    python -m app.db.partitioning enable            # online conversion of an existing chunks table
+    python -m app.db.partitioning promote <project_id>
+    python -m app.db.partitioning drop <project_id>
+    python -m app.db.partitioning status
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import uuid
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.redis_client import get_redis
+from app.db.session import engine
+
+PARENT = "chunks"
+DEFAULT_PARTITION = "chunks_default"
+
+# Secondary indexes every partition carries (the parent's indexes, matched by definition on ATTACH).
+INDEXED_COLUMNS = ["project_id", "document_id", "content_hash"]
+
+# Rows moved out of the default partition per transaction during a promotion.
+MOVE_BATCH_ROWS = 5000
+
+# Promotions announce their swap in this Redis sorted set (project id -> announced at) SWAP_NOTICE_S before
+# moving any rows, so readers only wait on the swap lock for projects that are actually being promoted.
+SWAPPING_KEY = "chunks:swapping"
+SWAP_NOTICE_S = 5.0
+# Announcements older than this belong to a promotion that died without clearing its own.
+SWAP_ANNOUNCE_TTL_S = 3600
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def partition_name(project_id: uuid.UUID) -> str:
+    return f"chunks_p_{project_id.hex}"
+
+
+def _exclusion_name(project_id: uuid.UUID) -> str:
+    # CHECK (project_id <> ...) on the default partition while the project is being moved out of it.
+    return f"{DEFAULT_PARTITION}_not_{project_id.hex}"
+
+
+def _swap_lock_key(project_id: uuid.UUID) -> str:
+    return f"chunks_swap:{project_id}"
+
+
+def hold_swap(db: Session, project_id: uuid.UUID) -> None:
+    """
+    Keep a promotion of the project from starting its swap until the current transaction ends, waiting for
+    one in progress first (promote_project moves the rows out of the default partition, which then rejects
+    the project's inserts, before it attaches the new one). Taken by writers of the project's chunks.
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock_shared(hashtext(:k))"), {"k": _swap_lock_key(project_id)})
+
+
+def wait_for_swap(db: Session, project_id: uuid.UUID) -> None:
+    """Wait for a swap of the project in progress to finish, without holding anything. Taken by readers."""
+    db.execute(
+        text("SELECT pg_advisory_lock_shared(hashtext(:k)), pg_advisory_unlock_shared(hashtext(:k))"),
+        {"k": _swap_lock_key(project_id)},
+    )
+
+
+_swap_view: tuple[float, frozenset[str]] = (0.0, frozenset())
+
+
+def swap_announced(project_id: uuid.UUID) -> bool:
+    """
+    Whether a promotion of the project may be moving its rows, so a reader should wait_for_swap first.
+
+    Answered from a per-process copy of the announcements, refreshed at most every SWAP_NOTICE_S / 2: a
+    promotion announces itself SWAP_NOTICE_S before it takes the swap lock, so every process sees it in
+    time, and searches of all other projects cost no extra round trip. True if Redis cannot be read.
+    """
+    global _swap_view
+    now = time.time()
+    refreshed_at, projects = _swap_view
+    if now - refreshed_at >= SWAP_NOTICE_S / 2:
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.zremrangebyscore(SWAPPING_KEY, "-inf", now - SWAP_ANNOUNCE_TTL_S)
+            pipe.zrange(SWAPPING_KEY, 0, -1)
+            projects = frozenset(m.decode("utf-8") for m in pipe.execute()[1])
+        except RedisError:
+            return True
+        _swap_view = (now, projects)
+    return str(project_id) in projects
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return bool(conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"), {"t": PARENT}
+    ).scalar())
+
+
+def _is_attached(conn: Connection, name: str) -> bool:
+    return bool(conn.execute(
+        text("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:t) AND inhparent = to_regclass(:p)"),
+        {"t": name, "p": PARENT},
+    ).scalar())
+
+
+def _hnsw_params(rows: int) -> tuple[int, int]:
+    """(m, ef_construction): pgvector defaults for typical tenants, denser graphs for very large ones."""
+    if rows >= 1_000_000:
+        return 32, 128
+    if rows >= 200_000:
+        return 24, 96
+    return 16, 64
+
+
+def enable_partitioning() -> None:
+    """
+    Turn the plain `chunks` table into the DEFAULT partition of a new partitioned `chunks` parent.
+
+    The only slow step (the (id, project_id) unique index the parent requires) is built CONCURRENTLY;
+    the swap itself is catalog-only: renames, an empty parent, and attaching the old table as DEFAULT
+    (no scan, since no other partition exists yet). Safe to re-run.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if is_partitioned(conn):
+            return
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {DEFAULT_PARTITION}_id_project_id_key "
+            f"ON {PARENT} (id, project_id)"
+        ))
+
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        conn.execute(text(
+            f"ALTER TABLE {PARENT} ADD CONSTRAINT {DEFAULT_PARTITION}_id_project_id_key "
+            f"UNIQUE USING INDEX {DEFAULT_PARTITION}_id_project_id_key"
+        ))
+        conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {DEFAULT_PARTITION}"))
+        for col in INDEXED_COLUMNS:
+            conn.execute(text(f"ALTER INDEX IF EXISTS ix_chunks_{col} RENAME TO {DEFAULT_PARTITION}_{col}_idx"))
+
+        conn.execute(text(
+            f"CREATE TABLE {PARENT} (LIKE {DEFAULT_PARTITION} INCLUDING DEFAULTS) PARTITION BY LIST (project_id)"
+        ))
+        # Unique keys of a partitioned table must include the partition key; ids stay globally unique
+        # because they are random UUIDs.
+        conn.execute(text(f"ALTER TABLE {PARENT} ADD CONSTRAINT chunks_id_project_id_key UNIQUE (id, project_id)"))
+        conn.execute(text(
+            f"ALTER TABLE {PARENT} ADD CONSTRAINT chunks_document_id_fkey "
+            f"FOREIGN KEY (document_id) REFERENCES documents (id)"
+        ))
+        for col in INDEXED_COLUMNS:
+            conn.execute(text(f"CREATE INDEX ix_chunks_{col} ON {PARENT} ({col})"))
+        conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def project_rows_in_default(db: Session, project_id: uuid.UUID) -> int:
+    """Rows of the project still in the default partition; 0 while chunks is not partitioned."""
+    if not is_partitioned(db.connection()):
+        return 0
+    return db.execute(
+        text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE project_id = :p"), {"p": project_id}
+    ).scalar()
+
+
+def promote_project(project_id: uuid.UUID) -> dict:
+    """
+    Move a project's chunks from the DEFAULT partition into a dedicated partition.
+
+    The copy and the index builds run on a detached table without blocking anyone. The swap then takes no
+    lock other tenants wait on, other than a catalog-only ALTER:
+
+    1. Announce the swap (swap_announced), wait SWAP_NOTICE_S, and take the project's swap lock, which
+       pauses its ingests and searches (hold_swap / wait_for_swap). Sync rows changed since the copy, then
+       add CHECK (project_id <> <project>) NOT VALID to the default partition: no row of the project can
+       enter it from here on, so what is left there is the final delta.
+    2. Move the project's rows out of the default partition in batches of MOVE_BATCH_ROWS, one transaction
+       each, then VALIDATE the check: a full scan, but it only takes SHARE UPDATE EXCLUSIVE, so reads and
+       writes of other tenants continue.
+    3. ATTACH the new partition. The validated check proves the default partition holds no rows for the
+       project, so Postgres skips the scan it would otherwise do under ACCESS EXCLUSIVE. Both checks are
+       then dropped.
+
+    If 2 or 3 fails the rows are moved back; a run interrupted harder than that is resumed from step 2 by
+    the next promote.
+    """
+    part = partition_name(project_id)
+    exclusion = _exclusion_name(project_id)
+    lock_key = f"chunks_promote:{project_id}"
+
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            raise PartitioningError("chunks is not partitioned; run `python -m app.db.partitioning enable` first")
+        if not conn.execute(text("SELECT pg_try_advisory_lock(hashtext(:k))"), {"k": lock_key}).scalar():
+            return {"project_id": str(project_id), "status": "in_progress"}
+        conn.commit()
+        try:
+            if _is_attached(conn, part):
+                return {"project_id": str(project_id), "status": "exists", "partition": part}
+
+            if _has_constraint(conn, DEFAULT_PARTITION, exclusion):
+                # Interrupted after step 1: part of the rows may already be in the detached partition.
+                _begin_swap(conn, project_id)
+                m, _ = _hnsw_params(conn.execute(text(f"SELECT count(*) FROM {part}")).scalar())
+                return _finish_swap(conn, project_id, m)
+
+            conn.execute(text(f"DROP TABLE IF EXISTS {part}"))  # leftover of an interrupted copy
+            conn.execute(text(f"CREATE TABLE {part} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+            # Lets ATTACH skip validating the new partition's rows.
+            conn.execute(text(f"ALTER TABLE {part} ADD CONSTRAINT {part}_project_check CHECK (project_id = '{project_id}')"))
+            conn.execute(
+                text(f"INSERT INTO {part} SELECT * FROM {DEFAULT_PARTITION} WHERE project_id = :p"), {"p": project_id}
+            )
+            conn.commit()
+
+            rows = conn.execute(text(f"SELECT count(*) FROM {part}")).scalar()
+            m, ef = _hnsw_params(rows)
+            conn.execute(text(f"ALTER TABLE {part} ADD CONSTRAINT {part}_id_project_id_key UNIQUE (id, project_id)"))
+            # NOT VALID, then VALIDATE in its own transaction: the check scan does not block writes to documents.
+            conn.execute(text(
+                f"ALTER TABLE {part} ADD CONSTRAINT {part}_document_id_fkey "
+                f"FOREIGN KEY (document_id) REFERENCES documents (id) NOT VALID"
+            ))
+            conn.commit()
+            conn.execute(text(f"ALTER TABLE {part} VALIDATE CONSTRAINT {part}_document_id_fkey"))
+            for col in INDEXED_COLUMNS:
+                conn.execute(text(f"CREATE INDEX {part}_{col}_idx ON {part} ({col})"))
+            conn.execute(text(
+                f"CREATE INDEX {part}_embedding_hnsw ON {part} "
+                f"USING hnsw (embedding vector_cosine_ops) WITH (m = {m}, ef_construction = {ef})"
+            ))
+            conn.commit()
+
+            # Step 1. The project's writers all take hold_swap, so under the swap lock its rows in the default
+            # partition no longer change. Chunks are only ever inserted or deleted (never updated), so syncing
+            # by id is exact.
+            _begin_swap(conn, project_id)
+            conn.execute(text(
+                f"DELETE FROM {part} c WHERE NOT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} d WHERE d.id = c.id)"
+            ))
+            conn.execute(
+                text(
+                    f"INSERT INTO {part} SELECT d.* FROM {DEFAULT_PARTITION} d WHERE d.project_id = :p "
+                    f"AND NOT EXISTS (SELECT 1 FROM {part} c WHERE c.id = d.id)"
+                ),
+                {"p": project_id},
+            )
+            conn.commit()
+            conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+            conn.execute(text(
+                f"ALTER TABLE {DEFAULT_PARTITION} ADD CONSTRAINT {exclusion} "
+                f"CHECK (project_id <> '{project_id}') NOT VALID"
+            ))
+            conn.commit()
+            return _finish_swap(conn, project_id, m)
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock_all()"))
+            conn.commit()
+            # Only once the swap lock is released: readers that still see the announcement pass straight through.
+            get_redis().zrem(SWAPPING_KEY, str(project_id))
+
+
+def _has_constraint(conn: Connection, table: str, name: str) -> bool:
+    return bool(conn.execute(
+        text("SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(:t) AND conname = :n"), {"t": table, "n": name}
+    ).scalar())
+
+
+def _begin_swap(conn: Connection, project_id: uuid.UUID) -> None:
+    """Announce the swap, give every process time to see it, then take the (session-level) swap lock."""
+    get_redis().zadd(SWAPPING_KEY, {str(project_id): time.time()})
+    time.sleep(SWAP_NOTICE_S)
+    conn.execute(text("SELECT pg_advisory_lock(hashtext(:k))"), {"k": _swap_lock_key(project_id)})
+    conn.commit()
+
+
+def _finish_swap(conn: Connection, project_id: uuid.UUID, m: int) -> dict:
+    """Steps 2 and 3 of promote_project; on failure the rows go back to the default partition."""
+    part = partition_name(project_id)
+    exclusion = _exclusion_name(project_id)
+    try:
+        # Rows already copied in step 1 conflict and are only deleted from the default partition.
+        move = text(
+            f"WITH moved AS ("
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE ctid = ANY(ARRAY("
+            f"SELECT ctid FROM {DEFAULT_PARTITION} WHERE project_id = :p LIMIT :n)) RETURNING *"
+            f"), copied AS (INSERT INTO {part} SELECT * FROM moved ON CONFLICT DO NOTHING) "
+            f"SELECT count(*) FROM moved"
+        )
+        while True:
+            moved = conn.execute(move, {"p": project_id, "n": MOVE_BATCH_ROWS}).scalar()
+            conn.commit()
+            if moved < MOVE_BATCH_ROWS:
+                break
+
+        conn.execute(text(f"ALTER TABLE {DEFAULT_PARTITION} VALIDATE CONSTRAINT {exclusion}"))
+        conn.commit()
+        _attach(conn, project_id)
+    except Exception:
+        conn.rollback()
+        conn.execute(text(f"ALTER TABLE {DEFAULT_PARTITION} DROP CONSTRAINT IF EXISTS {exclusion}"))
+        conn.execute(text(f"INSERT INTO {DEFAULT_PARTITION} SELECT * FROM {part} ON CONFLICT DO NOTHING"))
+        conn.execute(text(f"DROP TABLE {part}"))
+        conn.commit()
+        raise
+    rows = conn.execute(text(f"SELECT count(*) FROM {part}")).scalar()
+    return {"project_id": str(project_id), "status": "promoted", "partition": part, "rows": rows, "hnsw_m": m}
+
+
+def _attach(conn: Connection, project_id: uuid.UUID) -> None:
+    part = partition_name(project_id)
+    conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {part} FOR VALUES IN ('{project_id}')"))
+    conn.execute(text(f"ALTER TABLE {DEFAULT_PARTITION} DROP CONSTRAINT {_exclusion_name(project_id)}"))
+    conn.execute(text(f"ALTER TABLE {part} DROP CONSTRAINT {part}_project_check"))
+    conn.commit()
+
+
+def drop_project_chunks(project_id: uuid.UUID) -> dict:
+    """Delete all chunks of a project: a partition drop if it has its own partition, else a DELETE."""
+    part = partition_name(project_id)
+    with engine.begin() as conn:
+        if is_partitioned(conn) and _is_attached(conn, part):
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {part}"))
+            conn.execute(text(f"DROP TABLE {part}"))
+            return {"project_id": str(project_id), "dropped": part}
+        deleted = conn.execute(text(f"DELETE FROM {PARENT} WHERE project_id = :p"), {"p": project_id}).rowcount
+        return {"project_id": str(project_id), "deleted": deleted}
+
+
+def status() -> dict:
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return {"partitioned": False}
+        rows = conn.execute(text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound, c.reltuples::bigint AS est_rows, "
+            "pg_total_relation_size(c.oid) AS bytes "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:p) ORDER BY c.relname"
+        ), {"p": PARENT}).mappings().all()
+        return {"partitioned": True, "partitions": [dict(r) for r in rows]}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("enable")
+    sub.add_parser("status")
+    for name in ("promote", "drop"):
+        sub.add_parser(name).add_argument("project_id", type=uuid.UUID)
+    args = ap.parse_args()
+
+    if args.cmd == "enable":
+        enable_partitioning()
+        result = status()
+    elif args.cmd == "promote":
+        result = promote_project(args.project_id)
+    elif args.cmd == "drop":
+        result = drop_project_chunks(args.project_id)
+    else:
+        result = status()
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
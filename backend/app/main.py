@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from app.core.config import settings
+from app.core.telemetry import TelemetryMiddleware, render_metrics
 from app.db.session import init_db
 from app.api.routes import router as api_router
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.api.v1.demo_auth import router as demo_auth_router
+from app.services.ci_dispatch import dispatcher as ci_dispatcher
 
 app = FastAPI(title="AI Test Automation Copilot API", version="0.1.0")
 
@@ -14,11 +18,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+app.add_middleware(TelemetryMiddleware)
 
 @app.on_event("startup")
 def _startup():
-    init_db()
+    # Migrations run once per deploy (docker compose `migrate` service), not on every API boot.
+    if settings.db_create_all:
+        init_db()
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await ci_dispatcher.aclose()
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 app.include_router(api_router, prefix="/api")
 app.include_router(demo_auth_router, prefix="/api")
\ No newline at end of file
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import hashlib
 import re
 
+from app.core.config import settings
+from app.services.tokens import count_tokens, split_tokens
+
 def normalize(text: str) -> str:
     text = text.replace("\r\n", "\n").replace("\r", "\n")
     text = re.sub(r"[ \t]+", " ", text)
     text = re.sub(r"\n{3,}", "\n\n", text)
     return text.strip()
 
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
 def chunk_text(text: str, chunk_size: int = 1200, overlap: int = 200) -> list[str]:
     text = normalize(text)
     if not text:
@@ -34,3 +41,215 @@ def chunk_text(text: str, chunk_size: int = 1200, overlap: int = 200) -> list[st
 
     # Remove tiny chunks
     return [c for c in chunks if len(c) >= 40]
+
+
+# --- Token-bounded, structure-aware chunking ---------------------------------------------------------
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_TABLE_ROW = re.compile(r"^\s*\|")
+_TABLE_DIVIDER = re.compile(r"^\s*\|?[\s:|-]+\|?\s*$")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+
+# A heading at this level or above always starts a new chunk; deeper subsections are packed together
+# with their parent section while they fit.
+SECTION_LEVEL = 2
+MIN_CHUNK_CHARS = 40
+
+STRATEGIES = ("markdown", "tokens", "chars")
+
+
+def _starts_block(line: str, parse_headings: bool) -> bool:
+    return bool(
+        (parse_headings and _HEADING.match(line)) or _FENCE.match(line) or _TABLE_ROW.match(line) or _LIST_ITEM.match(line)
+    )
+
+
+def _blocks(text: str, parse_headings: bool) -> list[dict]:
+    """Split into heading / code / table / list / paragraph blocks, each tagged with its heading path."""
+    lines = text.split("\n")
+    blocks: list[dict] = []
+    path: list[tuple[int, str]] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+
+        m = _HEADING.match(line) if parse_headings else None
+        if m:
+            level = len(m.group(1))
+            path = [h for h in path if h[0] < level] + [(level, m.group(2))]
+            blocks.append({"kind": "heading", "level": level, "text": line.strip(), "path": list(path)})
+            i += 1
+            continue
+
+        j = i + 1
+        fence = _FENCE.match(line)
+        if fence:
+            kind = "code"
+            while j < len(lines) and not lines[j].strip().startswith(fence.group(1)):
+                j += 1
+            j = min(j + 1, len(lines))
+        elif _TABLE_ROW.match(line):
+            kind = "table"
+            while j < len(lines) and _TABLE_ROW.match(lines[j]):
+                j += 1
+        elif _LIST_ITEM.match(line):
+            kind = "list"
+            # Items and their indented continuation lines.
+            while j < len(lines) and lines[j].strip() and (_LIST_ITEM.match(lines[j]) or lines[j][:1] in (" ", "\t")):
+                j += 1
+        else:
+            kind = "paragraph"
+            while j < len(lines) and lines[j].strip() and not _starts_block(lines[j], parse_headings):
+                j += 1
+        blocks.append({"kind": kind, "text": "\n".join(lines[i:j]), "path": list(path)})
+        i = j
+    return blocks
+
+
+def _pack(units: list[str], max_tokens: int, overlap: int, sep: str = "\n", prefix: str = "") -> list[str]:
+    """Greedily join units into pieces of at most max_tokens; units that are too big alone are hard-split."""
+    head = f"{prefix}{sep}" if prefix else ""
+    budget = max(1, max_tokens - count_tokens(head))
+    pieces: list[str] = []
+    cur: list[str] = []
+    used = 0
+    for unit in units:
+        t = count_tokens(unit)
+        if t > budget:
+            if cur:
+                pieces.append(head + sep.join(cur))
+                cur, used = [], 0
+            pieces.extend(head + part for part in split_tokens(unit, budget, overlap))
+            continue
+        if cur and used + t + 1 > budget:
+            pieces.append(head + sep.join(cur))
+            cur, used = [], 0
+        cur.append(unit)
+        used += t + 1
+    if cur:
+        pieces.append(head + sep.join(cur))
+    return pieces
+
+
+def _split_block(block: dict, max_tokens: int, overlap: int) -> list[str]:
+    text = block["text"]
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    lines = text.split("\n")
+    if block["kind"] == "table":
+        # Every piece repeats the header row (and divider) so it stays a readable table.
+        n_head = 2 if len(lines) > 2 and _TABLE_DIVIDER.match(lines[1]) else 1
+        return _pack(lines[n_head:], max_tokens, overlap, prefix="\n".join(lines[:n_head]))
+    if block["kind"] == "list":
+        items: list[str] = []
+        for line in lines:
+            if _LIST_ITEM.match(line) or not items:
+                items.append(line)
+            else:
+                items[-1] += "\n" + line
+        return _pack(items, max_tokens, overlap)
+    if block["kind"] == "code":
+        return _pack(lines, max_tokens, overlap)
+    return _pack(_SENTENCE_END.split(text), max_tokens, overlap, sep=" ")
+
+
+def _render_path(path: list[tuple[int, str]]) -> str:
+    return "\n".join(f"{'#' * level} {title}" for level, title in path)
+
+
+def _common_path(paths: list[list[tuple[int, str]]]) -> list[tuple[int, str]]:
+    common = paths[0]
+    for p in paths[1:]:
+        n = 0
+        while n < min(len(common), len(p)) and common[n] == p[n]:
+            n += 1
+        common = common[:n]
+    return common
+
+
+def chunk_markdown(text: str, max_tokens: int = 512, overlap: int = 32, parse_headings: bool = True) -> list[dict]:
+    """
+    Structure-aware chunking: splits on headings, keeps lists, tables and code blocks whole where they fit
+    and packs blocks of a section into chunks of at most max_tokens. A chunk that starts inside a section
+    is prefixed with that section's heading path. Overlap is only used when a single unit (sentence, row,
+    line) has to be cut. Returns [{"text", "headings", "tokens"}]; headings is the section path.
+    """
+    text = normalize(text)
+    if not text:
+        return []
+
+    chunks: list[dict] = []
+    parts: list[str] = []
+    paths: list[list[tuple[int, str]]] = []
+    used = 0
+    pending: list[str] = []  # headings waiting for their first content
+
+    def flush() -> None:
+        nonlocal parts, paths, used
+        if parts:
+            chunks.append({"text": "\n\n".join(parts), "headings": [t for _, t in _common_path(paths)]})
+        parts, paths, used = [], [], 0
+
+    for block in _blocks(text, parse_headings):
+        if block["kind"] == "heading":
+            if block["level"] <= SECTION_LEVEL:
+                flush()
+                pending = []
+            pending.append(block["text"])
+            continue
+
+        prefix = _render_path(block["path"])
+        budget = max(1, max_tokens - count_tokens(prefix) - 2) if prefix else max_tokens
+        for piece in _split_block(block, budget, overlap):
+            addition = "\n\n".join(pending + [piece])
+            t = count_tokens(addition)
+            if parts and used + t + 2 > max_tokens:
+                flush()
+            if not parts:
+                # The heading path replaces the pending headings at the start of a chunk.
+                addition = "\n\n".join([prefix, piece]) if prefix else piece
+                t = count_tokens(addition)
+            parts.append(addition)
+            paths.append(block["path"])
+            used += t + 2
+            pending = []
+    flush()
+
+    out = []
+    for c in chunks:
+        # Joining can merge tokens differently than counted piecewise; re-check the hard bound.
+        pieces = [c["text"]] if count_tokens(c["text"]) <= max_tokens else split_tokens(c["text"], max_tokens, overlap)
+        for piece in pieces:
+            piece = piece.strip()
+            if len(piece) >= MIN_CHUNK_CHARS:
+                out.append({"text": piece, "headings": c["headings"], "tokens": count_tokens(piece)})
+    return out
+
+
+def chunk_strategy_for(content_type: str | None, filename: str | None) -> str:
+    """Strategy from CHUNK_STRATEGIES by file extension, then by content type, else CHUNK_DEFAULT_STRATEGY."""
+    name = (filename or "").lower()
+    ext = name[name.rfind("."):] if "." in name else ""
+    ct = (content_type or "").split(";")[0].strip().lower()
+    strategy = settings.chunk_strategies.get(ext) or settings.chunk_strategies.get(ct) or settings.chunk_default_strategy
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown chunk strategy: {strategy}")
+    return strategy
+
+
+def chunk_document(text: str, content_type: str | None, filename: str | None) -> list[dict]:
+    strategy = chunk_strategy_for(content_type, filename)
+    if strategy == "chars":
+        pieces = chunk_text(text, chunk_size=settings.chunk_size, overlap=settings.chunk_overlap)
+        return [{"text": p, "headings": [], "tokens": count_tokens(p)} for p in pieces]
+    return chunk_markdown(
+        text,
+        max_tokens=settings.chunk_max_tokens,
+        overlap=settings.chunk_overlap_tokens,
+        parse_headings=strategy == "markdown",
+    )
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+
+import httpx
+
+# Dispatches for the same project+ref within this window join the first one instead of starting
+# another workflow run.
+COALESCE_WINDOW_S = float(os.getenv("GH_DISPATCH_COALESCE_S", "30"))
+# /ci/status answers from cache for this long before asking GitHub again.
+STATUS_TTL_S = float(os.getenv("GH_STATUS_TTL_S", "10"))
+# Dispatch records (and their refresh locks) are forgotten this long after the dispatch; /ci/status then 404s.
+DISPATCH_RETENTION_S = float(os.getenv("GH_DISPATCH_RETENTION_S", "3600"))
+# Runs listed per poll while a dispatch is still waiting for its run to appear.
+RUNS_PER_PAGE = 50
+# Upper bound on cached (etag, body) pairs.
+MAX_ETAGS = 1000
+
+
+class CIDispatchError(Exception):
+    pass
+
+
+def github_config() -> dict:
+    cfg = {
+        "api_url": os.getenv("GH_API_URL", "https://api.github.com").rstrip("/"),
+        "token": os.getenv("GH_WORKFLOW_TOKEN"),
+        "owner": os.getenv("GH_REPO_OWNER"),
+        "repo": os.getenv("GH_REPO_NAME"),
+        "workflow": os.getenv("GH_WORKFLOW_FILE", "playwright-api-tests.yml"),
+        "ref": os.getenv("GH_WORKFLOW_REF", "main"),
+    }
+    if not cfg["token"] or not cfg["owner"] or not cfg["repo"]:
+        raise CIDispatchError("Missing GH_* env vars (token/owner/repo)")
+    return cfg
+
+
+class CIDispatcher:
+    """
+    Workflow dispatcher shared by all requests of an API process.
+
+    - One pooled AsyncClient (keep-alive, bounded connections) instead of a new connection per call.
+    - Dispatches are coalesced per (project, ref) within COALESCE_WINDOW_S; concurrent callers await
+      the same in-flight request.
+    - Each dispatch passes a unique `dispatch_id` workflow input, which the workflow puts in its run-name, so
+      the run is found by its display title rather than by timing (every project dispatches the same
+      workflow and ref, and manual runs may start at any time).
+    - Run status is cached for STATUS_TTL_S and refreshed with ETag-conditional requests, so most
+      polls cost nothing and 304s do not count against the GitHub rate limit.
+    - Records are kept in dispatch order and dropped DISPATCH_RETENTION_S after their dispatch, so memory
+      stays bounded by the dispatch rate rather than growing with every project ever dispatched.
+
+    State is per process; with several API workers each coalesces its own requests.
+    """
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._dispatches: dict[tuple[str, str], dict] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self._etags: dict[str, tuple[str, dict]] = {}  # url -> (etag, last body)
+
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28",
+                },
+                timeout=httpx.Timeout(20.0, connect=5.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _workflow_url(self, cfg: dict) -> str:
+        return f"{cfg['api_url']}/repos/{cfg['owner']}/{cfg['repo']}/actions/workflows/{cfg['workflow']}"
+
+    def _auth(self, cfg: dict) -> dict:
+        return {"Authorization": f"Bearer {cfg['token']}"}
+
+    def _prune(self, now: float) -> None:
+        # Oldest dispatch first: stop at the first record that is still fresh or in use.
+        for key, rec in list(self._dispatches.items()):
+            lock = self._locks.get(key)
+            in_use = not rec["future"].done() or (lock is not None and lock.locked())
+            if in_use or now - rec["dispatched_at"] < DISPATCH_RETENTION_S:
+                break
+            del self._dispatches[key]
+            self._locks.pop(key, None)
+
+    async def dispatch(self, project_id: str, cfg: dict) -> dict:
+        key = (project_id, cfg["ref"])
+        self._prune(time.time())
+        rec = self._dispatches.get(key)
+        if rec and (not rec["future"].done() or time.time() - rec["dispatched_at"] < COALESCE_WINDOW_S):
+            await asyncio.shield(rec["future"])
+            return {"dispatch_id": rec["dispatch_id"], "dispatched_at": rec["dispatched_at"], "coalesced": True}
+
+        fut = asyncio.get_running_loop().create_future()
+        rec = {
+            "future": fut,
+            "dispatch_id": uuid.uuid4().hex,
+            "dispatched_at": time.time(),
+            "run": None,
+            "checked_at": 0.0,
+        }
+        # Re-insert so the dict stays in dispatch order for _prune.
+        self._dispatches.pop(key, None)
+        self._dispatches[key] = rec
+        try:
+            r = await self.client().post(
+                f"{self._workflow_url(cfg)}/dispatches",
+                headers=self._auth(cfg),
+                json={"ref": cfg["ref"], "inputs": {"dispatch_id": rec["dispatch_id"]}},
+            )
+            if r.status_code not in (204, 201, 200):
+                raise CIDispatchError(f"GitHub dispatch failed: {r.status_code} {r.text}")
+        except (CIDispatchError, httpx.HTTPError) as e:
+            err = e if isinstance(e, CIDispatchError) else CIDispatchError(f"GitHub dispatch failed: {e!r}")
+            # Failed dispatches are not coalesced: the next click tries again.
+            self._dispatches.pop(key, None)
+            fut.set_exception(err)
+            fut.exception()  # mark retrieved when nobody else is waiting
+            raise err from e
+        fut.set_result(None)
+        return {"dispatch_id": rec["dispatch_id"], "dispatched_at": rec["dispatched_at"], "coalesced": False}
+
+    async def _get(self, cfg: dict, url: str, params: dict | None = None) -> dict:
+        cache_key = url + ("?" + "&".join(f"{k}={v}" for k, v in sorted(params.items())) if params else "")
+        headers = self._auth(cfg)
+        cached = self._etags.get(cache_key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        r = await self.client().get(url, headers=headers, params=params)
+        if r.status_code == 304 and cached:
+            return cached[1]
+        if r.status_code != 200:
+            raise CIDispatchError(f"GitHub status check failed: {r.status_code} {r.text}")
+        body = r.json()
+        if r.headers.get("etag"):
+            if len(self._etags) >= MAX_ETAGS:
+                self._etags.clear()
+            self._etags[cache_key] = (r.headers["etag"], body)
+        return body
+
+    async def status(self, project_id: str, cfg: dict) -> dict | None:
+        key = (project_id, cfg["ref"])
+        self._prune(time.time())
+        rec = self._dispatches.get(key)
+        if not rec:
+            return None
+
+        # One refresh at a time per key; concurrent pollers get the refreshed cache.
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            done = rec["run"] and rec["run"]["status"] == "completed"
+            if not done and time.time() - rec["checked_at"] >= STATUS_TTL_S:
+                await self._refresh(rec, cfg)
+
+        return {
+            "dispatch_id": rec["dispatch_id"],
+            "dispatched_at": rec["dispatched_at"],
+            "checked_at": rec["checked_at"],
+            "run": rec["run"],
+        }
+
+    async def _refresh(self, rec: dict, cfg: dict) -> None:
+        if rec["run"]:
+            url = f"{cfg['api_url']}/repos/{cfg['owner']}/{cfg['repo']}/actions/runs/{rec['run']['id']}"
+            run = await self._get(cfg, url)
+        else:
+            # The dispatch API does not return a run id: find the run whose run-name carries our dispatch id
+            # among the latest runs of this workflow/ref.
+            body = await self._get(
+                cfg,
+                f"{self._workflow_url(cfg)}/runs",
+                params={"event": "workflow_dispatch", "branch": cfg["ref"], "per_page": RUNS_PER_PAGE},
+            )
+            run = next(
+                (r for r in body.get("workflow_runs") or [] if rec["dispatch_id"] in (r.get("display_title") or "")),
+                None,
+            )
+
+        rec["checked_at"] = time.time()
+        if run:
+            rec["run"] = {
+                "id": run["id"],
+                "status": run.get("status"),
+                "conclusion": run.get("conclusion"),
+                "html_url": run.get("html_url"),
+                "created_at": run.get("created_at"),
+                "updated_at": run.get("updated_at"),
+            }
+
+
+dispatcher = CIDispatcher()
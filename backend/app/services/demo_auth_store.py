@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+
+def _window(now: float, window_s: int) -> tuple[int, float]:
+    """Current fixed-window index and how far into it we are (0..1)."""
+    return int(now // window_s), (now % window_s) / window_s
+
+
+class AuthStoreFull(Exception):
+    """The in-process store hit a size cap that only live users or tokens could make room under."""
+
+
+class AuthStore(ABC):
+    """
+    Storage for the demo auth service: users, bearer tokens and the failed-login rate limiter.
+
+    The rate limiter is a sliding-window counter: the previous window's count weighted by how much of it
+    still overlaps the sliding window, plus the current window's count. O(1) time and memory per key.
+    """
+
+    @abstractmethod
+    def get_user(self, email: str) -> dict | None: ...
+
+    @abstractmethod
+    def create_user(self, email: str, record: dict) -> bool:
+        """False if the user already exists. Raises AuthStoreFull if there is no room for another user."""
+
+    @abstractmethod
+    def save_user(self, email: str, record: dict) -> None: ...
+
+    @abstractmethod
+    def issue_token(self, email: str) -> str:
+        """Raises AuthStoreFull if there is no room for another token."""
+
+    @abstractmethod
+    def token_email(self, token: str) -> str | None: ...
+
+    @abstractmethod
+    def revoke_token(self, token: str) -> None: ...
+
+    @abstractmethod
+    def allow_attempt(self, key: str, limit: int, window_s: int) -> bool:
+        """Count one attempt for `key`; False (and not counted) if the limit is already reached."""
+
+    @abstractmethod
+    def reset_attempts(self, key: str, window_s: int) -> None: ...
+
+
+class MemoryAuthStore(AuthStore):
+    """
+    Single-process store. Every map is size-capped, but only state that is safe to lose is ever evicted:
+    expired tokens, and the least recently used failed-login buckets (dropping one only resets a counter).
+    Registered users and live tokens are never dropped; at their cap, registration and login raise
+    AuthStoreFull instead.
+    """
+
+    def __init__(self, token_ttl_s: int, max_users: int, max_tokens: int, max_rate_keys: int):
+        self.token_ttl_s = token_ttl_s
+        self.max_users = max_users
+        self.max_tokens = max_tokens
+        self.max_rate_keys = max_rate_keys
+        self._users: dict[str, dict] = {}
+        self._tokens: OrderedDict[str, tuple[str, float]] = OrderedDict()  # token -> (email, expires_at)
+        self._attempts: OrderedDict[str, list] = OrderedDict()  # key -> [window, prev, cur]
+        self._lock = threading.Lock()
+
+    def get_user(self, email: str) -> dict | None:
+        return self._users.get(email)
+
+    def create_user(self, email: str, record: dict) -> bool:
+        with self._lock:
+            if email in self._users:
+                return False
+            if len(self._users) >= self.max_users:
+                raise AuthStoreFull("user limit reached")
+            self._users[email] = record
+            return True
+
+    def save_user(self, email: str, record: dict) -> None:
+        with self._lock:
+            if email in self._users:
+                self._users[email] = record
+
+    def issue_token(self, email: str) -> str:
+        token = secrets.token_urlsafe(24)
+        now = time.time()
+        with self._lock:
+            # Tokens are inserted in expiry order, so expired ones are always at the front.
+            while self._tokens:
+                _, (_, expires) = next(iter(self._tokens.items()))
+                if expires > now:
+                    break
+                self._tokens.popitem(last=False)
+            if len(self._tokens) >= self.max_tokens:
+                raise AuthStoreFull("token limit reached")
+            self._tokens[token] = (email, now + self.token_ttl_s)
+        return token
+
+    def token_email(self, token: str) -> str | None:
+        entry = self._tokens.get(token)
+        if not entry:
+            return None
+        email, expires = entry
+        if expires <= time.time():
+            with self._lock:
+                self._tokens.pop(token, None)
+            return None
+        return email
+
+    def revoke_token(self, token: str) -> None:
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def allow_attempt(self, key: str, limit: int, window_s: int) -> bool:
+        w, frac = _window(time.time(), window_s)
+        with self._lock:
+            state = self._attempts.get(key)
+            if state is None:
+                state = self._attempts[key] = [w, 0, 0]
+                while len(self._attempts) > self.max_rate_keys:
+                    self._attempts.popitem(last=False)
+            else:
+                self._attempts.move_to_end(key)
+            if state[0] != w:
+                state[1] = state[2] if state[0] == w - 1 else 0
+                state[0], state[2] = w, 0
+            if state[1] * (1 - frac) + state[2] >= limit:
+                return False
+            state[2] += 1
+            return True
+
+    def reset_attempts(self, key: str, window_s: int) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+
+# KEYS: previous window counter, current window counter. ARGV: limit, fraction of current window elapsed, ttl.
+_ALLOW_ATTEMPT = """
+local prev = tonumber(redis.call('GET', KEYS[1]) or '0')
+local cur = tonumber(redis.call('GET', KEYS[2]) or '0')
+if prev * (1 - tonumber(ARGV[2])) + cur >= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+
+class RedisAuthStore(AuthStore):
+    """Shared store for multi-process / multi-host deployments. All keys carry a TTL."""
+
+    PREFIX = "demo_auth"
+
+    def __init__(self, token_ttl_s: int, user_ttl_s: int):
+        self.token_ttl_s = token_ttl_s
+        self.user_ttl_s = user_ttl_s
+        self.r = get_redis()
+        self._allow = self.r.register_script(_ALLOW_ATTEMPT)
+
+    def _user_key(self, email: str) -> str:
+        return f"{self.PREFIX}:user:{email}"
+
+    def _token_key(self, token: str) -> str:
+        return f"{self.PREFIX}:token:{token}"
+
+    def _attempt_key(self, key: str, window: int) -> str:
+        # Hash tag keeps both windows of a key in one cluster slot (the Lua script touches both).
+        return f"{self.PREFIX}:attempts:{{{key}}}:{window}"
+
+    def get_user(self, email: str) -> dict | None:
+        raw = self.r.get(self._user_key(email))
+        return json.loads(raw) if raw else None
+
+    def create_user(self, email: str, record: dict) -> bool:
+        return bool(self.r.set(self._user_key(email), json.dumps(record), nx=True, ex=self.user_ttl_s))
+
+    def save_user(self, email: str, record: dict) -> None:
+        self.r.set(self._user_key(email), json.dumps(record), xx=True, ex=self.user_ttl_s)
+
+    def issue_token(self, email: str) -> str:
+        token = secrets.token_urlsafe(24)
+        self.r.set(self._token_key(token), email, ex=self.token_ttl_s)
+        return token
+
+    def token_email(self, token: str) -> str | None:
+        raw = self.r.get(self._token_key(token))
+        return raw.decode("utf-8") if raw else None
+
+    def revoke_token(self, token: str) -> None:
+        self.r.delete(self._token_key(token))
+
+    def allow_attempt(self, key: str, limit: int, window_s: int) -> bool:
+        w, frac = _window(time.time(), window_s)
+        keys = [self._attempt_key(key, w - 1), self._attempt_key(key, w)]
+        return bool(self._allow(keys=keys, args=[limit, frac, 2 * window_s]))
+
+    def reset_attempts(self, key: str, window_s: int) -> None:
+        # Only the current and previous windows can hold counts; older keys have expired.
+        w, _ = _window(time.time(), window_s)
+        self.r.delete(self._attempt_key(key, w - 1), self._attempt_key(key, w))
+
+
+_store: AuthStore | None = None
+
+
+def get_auth_store() -> AuthStore:
+    global _store
+    if _store is None:
+        if settings.demo_auth_backend == "redis":
+            _store = RedisAuthStore(
+                token_ttl_s=settings.demo_auth_token_ttl_s,
+                user_ttl_s=settings.demo_auth_user_ttl_s,
+            )
+        else:
+            _store = MemoryAuthStore(
+                token_ttl_s=settings.demo_auth_token_ttl_s,
+                max_users=settings.demo_auth_max_users,
+                max_tokens=settings.demo_auth_max_tokens,
+                max_rate_keys=settings.demo_auth_max_rate_keys,
+            )
+    return _store
@@ -3,18 +3,35 @@ from __future__ import annotations
 from typing import Iterable
 
 from app.core.config import settings
+from app.core.telemetry import observe_batch, observe_tokens, span
 from app.services.openai_client import get_client
 
 def embed_texts(texts: list[str]) -> list[list[float]]:
     if not texts:
         return []
     client = get_client()
-    resp = client.embeddings.create(
-        model=settings.openai_embed_model,
-        input=texts,
-    )
+    observe_batch("openai.embeddings", len(texts))
+    with span("openai.embeddings", batch=len(texts)):
+        resp = client.embeddings.create(
+            model=settings.openai_embed_model,
+            input=texts,
+        )
+    observe_tokens("embeddings", getattr(resp, "usage", None))
     # resp.data is list of embeddings in same order as inputs
     return [d.embedding for d in resp.data]
 
+def token_batches(token_counts: list[int], max_tokens: int, max_inputs: int) -> list[tuple[int, int]]:
+    """[start, end) index ranges packing consecutive inputs up to max_tokens / max_inputs per request."""
+    batches: list[tuple[int, int]] = []
+    start, used = 0, 0
+    for i, t in enumerate(token_counts):
+        if i > start and (used + t > max_tokens or i - start >= max_inputs):
+            batches.append((start, i))
+            start, used = i, 0
+        used += t
+    if start < len(token_counts):
+        batches.append((start, len(token_counts)))
+    return batches
+
 def embed_query(text: str) -> list[float]:
     return embed_texts([text])[0]
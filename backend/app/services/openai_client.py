@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-from openai import OpenAI
+from typing import TYPE_CHECKING
+
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 _client: OpenAI | None = None
 
 def get_client() -> OpenAI:
     global _client
     if _client is None:
+        # Imported on first use: the SDK takes ~0.4s to import and most API requests never call OpenAI.
+        from openai import OpenAI
+
         # OpenAI SDK reads OPENAI_API_KEY from env automatically.
         # You can also pass api_key=... explicitly if needed.
         _client = OpenAI()
@@ -30,7 +30,7 @@ def _pick_tests(plan: dict) -> list[dict]:
     return out
 
 
-def _infer_endpoint(test: dict) -> tuple[str, str] | None:
+def infer_endpoint(test: dict) -> tuple[str, str] | None:
     # Try to find "METHOD /path" from steps/title
     text = " ".join([test.get("title", "")] + (test.get("steps") or []))
     m = re.search(r"\b(GET|POST|PATCH|PUT|DELETE)\s+(\/[A-Za-z0-9\/\-_{}]+)", text)
@@ -157,7 +157,7 @@ def generate_playwright_api_tests_zip(plan: dict, project_name: str = "AI Test C
         for t in api_tests:
             tid = (t.get("id") or "T000").strip()
             title = (t.get("title") or "Untitled").strip().replace("'", "\\'")
-            method_path = _infer_endpoint(t)
+            method_path = infer_endpoint(t)
             method, path = method_path if method_path else ("GET", "/")
 
             raw_path = path
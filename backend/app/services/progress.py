@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+import redis
+
+from app.core.redis_client import get_redis
+
+# Latest event per job is kept as a snapshot (for late subscribers and batch status);
+# every event is also published on the job's pub/sub channel for live streams.
+SNAPSHOT_TTL_S = 24 * 3600
+TERMINAL_STATES = {"SUCCESS", "FAILURE", "REVOKED"}
+
+
+def channel(job_id: str) -> str:
+    return f"jobs:{job_id}:events"
+
+
+def snapshot_key(job_id: str) -> str:
+    return f"jobs:{job_id}:progress"
+
+
+def publish_progress(job_id: str | None, stage: str, state: str = "PROGRESS", **data: Any) -> None:
+    """Best-effort: progress reporting must never fail the job itself."""
+    if not job_id:
+        return
+    event = {"job_id": job_id, "state": state, "stage": stage, "ts": time.time(), **data}
+    payload = json.dumps(event, default=str)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.set(snapshot_key(job_id), payload, ex=SNAPSHOT_TTL_S)
+        pipe.publish(channel(job_id), payload)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def decode_event(payload: bytes | str | None) -> dict | None:
+    if not payload:
+        return None
+    return json.loads(payload)
@@ -2,24 +2,32 @@ from __future__ import annotations
 
 import uuid
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 
 from app.core.config import settings
+from app.core.telemetry import span
 from app.db.models import Chunk
+from app.db.partitioning import swap_announced, wait_for_swap
 from app.services.embeddings import embed_query
 
 def semantic_search(db: Session, project_id: uuid.UUID, query: str, top_k: int | None = None):
     k = top_k or settings.rag_top_k
-    qvec = embed_query(query)
+    with span("search.embed_query"):
+        qvec = embed_query(query)
 
     # pgvector provides distance helpers on Vector columns (cosine_distance, l2_distance, etc.)
+    # project_id is rendered as a literal so a partitioned chunks table is pruned at plan time and the
+    # project partition's HNSW index can serve the ORDER BY (a generic prepared plan cannot use it).
     stmt = (
         select(Chunk)
-        .where(Chunk.project_id == project_id)
+        .where(Chunk.project_id == bindparam("project_id", project_id, literal_execute=True))
         .order_by(Chunk.embedding.cosine_distance(qvec))
         .limit(k)
     )
-    rows = db.execute(stmt).scalars().all()
+    with span("search.pgvector_query", top_k=k):
+        if settings.chunk_partitioning and swap_announced(project_id):
+            wait_for_swap(db, project_id)
+        rows = db.execute(stmt).scalars().all()
     return [
         {
             "chunk_id": str(r.id),
@@ -4,10 +4,14 @@ import json
 import re
 import uuid
 from sqlalchemy.orm import Session
+from sqlalchemy import select, desc, insert, null, update
 
 from app.core.config import settings
-from app.db.models import TestPlan
+from app.core.telemetry import observe_batch, observe_tokens, span
+from app.db.models import Chunk, TestPlan, TestCase
 from app.services.search import semantic_search
+from app.services.playwright_api_gen import infer_endpoint
+from app.services.progress import publish_progress
 from app.services.openai_client import get_client
 
 TEST_PLAN_SCHEMA_HINT = {
@@ -27,6 +31,8 @@ TEST_PLAN_SCHEMA_HINT = {
     ]
 }
 
+_UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
 def _extract_json(text: str) -> dict:
     # Best-effort JSON extraction
     m = re.search(r"\{.*\}", text, flags=re.DOTALL)
@@ -34,13 +40,160 @@ def _extract_json(text: str) -> dict:
         raise ValueError("Model did not return JSON")
     return json.loads(m.group(0))
 
-def generate_test_plan(db: Session, project_id: uuid.UUID, job_id: str) -> dict:
-    # Retrieve context via semantic search using a broad query
-    contexts = semantic_search(db, project_id, "requirements, user flows, API endpoints, error cases, auth, validation", top_k=settings.rag_top_k)
-    context_blob = "\n\n".join(
+def _context_blob(contexts: list[dict]) -> str:
+    return "\n\n".join(
         [f"[Chunk {c['chunk_id']} / doc {c['document_id']} idx {c['idx']}]\n{c['text']}" for c in contexts]
     )
 
+def _ask_model(prompt: str) -> dict:
+    client = get_client()
+    with span("plan.openai_responses", model=settings.openai_chat_model):
+        resp = client.responses.create(
+            model=settings.openai_chat_model,
+            input=prompt,
+        )
+    observe_tokens("responses", getattr(resp, "usage", None))
+    with span("plan.extract_json"):
+        return _extract_json(resp.output_text)
+
+def _current_hashes(db: Session, project_id: uuid.UUID) -> dict[str, str | None]:
+    rows = db.execute(select(Chunk.id, Chunk.content_hash).where(Chunk.project_id == project_id)).all()
+    return {str(cid): h for cid, h in rows}
+
+def _latest_plan(db: Session, project_id: uuid.UUID) -> TestPlan | None:
+    return db.execute(
+        select(TestPlan).where(TestPlan.project_id == project_id).order_by(desc(TestPlan.created_at)).limit(1)
+    ).scalars().first()
+
+def _cited_chunk_ids(test: dict) -> list[str]:
+    ids: list[str] = []
+    for s in test.get("sources") or []:
+        ids.extend(m.lower() for m in _UUID_RE.findall(str(s)))
+    return ids
+
+def _source_snapshot(plan: dict, hashes: dict[str, str | None]) -> dict:
+    """What incremental regeneration needs from the current chunks: every hash, plus id -> hash for cited chunks."""
+    cited = {cid for t in plan.get("tests") or [] for cid in _cited_chunk_ids(t)}
+    return {
+        "hashes": sorted({h for h in hashes.values() if h}),
+        "cited": {cid: hashes[cid] for cid in sorted(cited) if hashes.get(cid)},
+    }
+
+def _read_snapshot(source_hashes: dict) -> tuple[set[str], dict[str, str]]:
+    """(known hashes, cited chunk id -> hash); plans saved before the snapshot format map every chunk id -> hash."""
+    if "hashes" in source_hashes and "cited" in source_hashes:
+        return set(source_hashes["hashes"]), source_hashes["cited"]
+    return {h for h in source_hashes.values() if h}, {cid: h for cid, h in source_hashes.items() if h}
+
+def _title_key(test: dict) -> str:
+    return " ".join(str(test.get("title") or "").lower().split())
+
+def _full_diff(base: TestPlan | None, plan: dict) -> dict:
+    """
+    Diff of a fully regenerated plan against its base. Test ids restart at T001 on every full run, so tests
+    are matched by normalized title: matches are "kept", unmatched new tests "added", unmatched base tests
+    "removed" (ids are those of the new and the base plan respectively).
+    """
+    tests = plan.get("tests") or []
+    base_tests = (base.plan_json or {}).get("tests") or [] if base else []
+    base_titles = {_title_key(t) for t in base_tests}
+    titles = {_title_key(t) for t in tests}
+    return {
+        "mode": "full",
+        "kept": [t.get("id") for t in tests if _title_key(t) in base_titles],
+        "removed": [t.get("id") for t in base_tests if _title_key(t) not in titles],
+        "uncited": [],
+        "added": [t.get("id") for t in tests if _title_key(t) not in base_titles],
+    }
+
+def _test_number(test: dict) -> int:
+    m = re.search(r"\d+", str(test.get("id") or ""))
+    return int(m.group(0)) if m else 0
+
+def _test_case_rows(plan_id: uuid.UUID, project_id: uuid.UUID, plan: dict) -> list[dict]:
+    rows = []
+    for pos, t in enumerate(plan.get("tests") or []):
+        method_path = infer_endpoint(t)
+        rows.append({
+            "id": uuid.uuid4(),
+            "plan_id": plan_id,
+            "project_id": project_id,
+            "position": pos,
+            "test_id": str(t.get("id") or f"T{pos + 1:03d}")[:50],
+            "priority": (str(t["priority"]).upper()[:10] if t.get("priority") else None),
+            "type": (str(t["type"]).lower()[:30] if t.get("type") else None),
+            "title": str(t.get("title") or ""),
+            "endpoint": f"{method_path[0]} {method_path[1]}"[:300] if method_path else None,
+            "tags": [str(x) for x in t.get("tags") or []],
+            "sources": [str(x) for x in t.get("sources") or []],
+            "body": t,
+        })
+    return rows
+
+def backfill_test_cases(db: Session, plan_id: uuid.UUID) -> int:
+    """
+    Write the test_cases rows of a plan saved before they existed, from its plan_json. Row-locks the plan so
+    concurrent callers backfill once; returns the number of rows written.
+    """
+    has_rows = select(TestCase.id).where(TestCase.plan_id == plan_id).limit(1)
+    if db.execute(has_rows).first():
+        return 0
+    plan = db.execute(select(TestPlan).where(TestPlan.id == plan_id).with_for_update()).scalars().first()
+    if not plan or db.execute(has_rows).first():
+        db.rollback()
+        return 0
+    cases = _test_case_rows(plan.id, plan.project_id, plan.plan_json or {})
+    if cases:
+        db.execute(insert(TestCase), cases)
+    db.commit()
+    return len(cases)
+
+def _save_plan(
+    db: Session,
+    project_id: uuid.UUID,
+    job_id: str,
+    plan: dict,
+    hashes: dict[str, str | None],
+    base: TestPlan | None = None,
+    diff: dict | None = None,
+) -> TestPlan:
+    row = TestPlan(
+        project_id=project_id,
+        job_id=job_id,
+        plan_json=plan,
+        version=(base.version or 1) + 1 if base else 1,
+        base_plan_id=base.id if base else None,
+        diff=diff,
+        source_hashes=_source_snapshot(plan, hashes),
+    )
+    db.add(row)
+    db.flush()
+    # Only the latest plan is ever a base, so older versions drop their snapshot: storage stays at one
+    # snapshot per project instead of growing with versions x chunks.
+    db.execute(
+        update(TestPlan)
+        .where(TestPlan.project_id == project_id, TestPlan.id != row.id, TestPlan.source_hashes.isnot(None))
+        .values(source_hashes=null())
+    )
+    cases = _test_case_rows(row.id, project_id, plan)
+    observe_batch("plan.test_cases", len(cases))
+    with span("plan.db_commit", tests=len(cases)):
+        if cases:
+            db.execute(insert(TestCase), cases)
+        db.commit()
+    return row
+
+def generate_test_plan(db: Session, project_id: uuid.UUID, job_id: str) -> dict:
+    # Snapshot chunk hashes before retrieval so a later incremental run can tell what changed.
+    hashes = _current_hashes(db, project_id)
+    base = _latest_plan(db, project_id)
+
+    # Retrieve context via semantic search using a broad query
+    with span("plan.semantic_search"):
+        contexts = semantic_search(db, project_id, "requirements, user flows, API endpoints, error cases, auth, validation", top_k=settings.rag_top_k)
+    context_blob = _context_blob(contexts)
+    publish_progress(job_id, "context_retrieved", chunks=len(contexts), mode="full")
+
     prompt = f"""You are an expert QA/SDET and software engineer.
 Create a practical test plan for the project based ONLY on the context below.
 
@@ -57,15 +210,110 @@ CONTEXT:
 {context_blob}
 """
 
-    client = get_client()
-    resp = client.responses.create(
-        model=settings.openai_chat_model,
-        input=prompt,
-    )
-    out = resp.output_text
-    plan = _extract_json(out)
+    plan = _ask_model(prompt)
+    publish_progress(job_id, "tests_parsed", tests=len(plan.get("tests") or []))
+    diff = _full_diff(base, plan)
+    _save_plan(db, project_id, job_id, plan, hashes, base=base, diff=diff)
+    return plan
 
-    row = TestPlan(project_id=project_id, job_id=job_id, plan_json=plan)
-    db.add(row)
-    db.commit()
+def generate_test_plan_incremental(db: Session, project_id: uuid.UUID, job_id: str) -> dict:
+    """
+    Regenerate only the part of the latest plan affected by chunk changes.
+
+    Tests whose cited chunks still exist with identical content are kept (with their sources remapped to the
+    current chunk ids, since re-ingest recreates chunk rows). Tests citing removed/modified chunks are dropped.
+    Tests without a citation that resolves to a chunk (short citations are allowed) are kept as-is, since no
+    change can be attributed to them; the diff lists them under "uncited". The model is asked for tests
+    covering only the added/modified chunks, which it sees in full. Falls back to a full regeneration when
+    there is no usable base plan or the change set is larger than the retrieval budget.
+    """
+    base = _latest_plan(db, project_id)
+    if not base or not base.source_hashes:
+        return generate_test_plan(db, project_id, job_id)
+
+    hashes = _current_hashes(db, project_id)
+    hash_to_id: dict[str, str] = {h: cid for cid, h in hashes.items() if h}
+    known, old_hashes = _read_snapshot(base.source_hashes)
+
+    changed_ids = [cid for cid, h in hashes.items() if not h or h not in known]
+    if len(changed_ids) > settings.rag_top_k:
+        return generate_test_plan(db, project_id, job_id)
+
+    old_plan = base.plan_json or {}
+    kept: list[dict] = []
+    removed: list[str] = []
+    uncited: list[str] = []
+    for t in old_plan.get("tests") or []:
+        cited = [cid for cid in _cited_chunk_ids(t) if cid in old_hashes]
+        if not cited:
+            kept.append(t)
+            uncited.append(t.get("id"))
+            continue
+        current = [hash_to_id.get(old_hashes[cid]) for cid in cited]
+        if all(current):
+            remap = dict(zip(cited, current))
+            t = dict(t)
+            t["sources"] = [
+                _UUID_RE.sub(lambda m: remap.get(m.group(0).lower(), m.group(0)), str(s))
+                for s in t.get("sources") or []
+            ]
+            kept.append(t)
+        else:
+            removed.append(t.get("id"))
+
+    new_tests: list[dict] = []
+    if changed_ids:
+        rows = db.execute(
+            select(Chunk)
+            .where(Chunk.project_id == project_id, Chunk.id.in_([uuid.UUID(c) for c in changed_ids]))
+            .order_by(Chunk.document_id, Chunk.idx)
+        ).scalars().all()
+        # Full text: these chunks are what the run re-plans (chunks are bounded by CHUNK_MAX_TOKENS, and at
+        # most rag_top_k of them get here).
+        contexts = [
+            {"chunk_id": str(r.id), "document_id": str(r.document_id), "idx": r.idx, "text": r.text} for r in rows
+        ]
+        publish_progress(job_id, "context_retrieved", chunks=len(contexts), mode="incremental", kept=len(kept))
+        existing = "\n".join(f"- {t.get('id')}: {t.get('title')}" for t in kept) or "(none)"
+
+        prompt = f"""You are an expert QA/SDET and software engineer.
+A test plan already exists for this project. Some requirement documents were added or edited.
+Write ONLY the new tests needed to cover the CHANGED CONTEXT below. Do not repeat existing tests.
+
+Output STRICT JSON (no markdown) with this shape (keys must exist):
+{json.dumps(TEST_PLAN_SCHEMA_HINT, indent=2)}
+
+Rules:
+- Prefer high-value tests: auth, validation, error handling, rate limits, permissions, idempotency, boundary cases.
+- Each test MUST include a 'sources' array referencing chunk ids (e.g., 'Chunk <uuid>') from the changed context.
+- Keep steps actionable and specific.
+
+EXISTING TESTS:
+{existing}
+
+CHANGED CONTEXT:
+{_context_blob(contexts)}
+"""
+        new_tests = _ask_model(prompt).get("tests") or []
+        publish_progress(job_id, "tests_parsed", tests=len(new_tests))
+
+    # Number new tests after the highest id of the base plan so removed ids are never reused.
+    n = max([_test_number(t) for t in old_plan.get("tests") or []] or [0])
+    for t in new_tests:
+        n += 1
+        t["id"] = f"T{n:03d}"
+
+    plan = {
+        "project_overview": old_plan.get("project_overview", ""),
+        "tests": kept + new_tests,
+    }
+    diff = {
+        "mode": "incremental",
+        "kept": [t.get("id") for t in kept],
+        "removed": removed,
+        "uncited": uncited,
+        "added": [t.get("id") for t in new_tests],
+        "changed_chunks": len(changed_ids),
+    }
+    _save_plan(db, project_id, job_id, plan, hashes, base=base, diff=diff)
     return plan
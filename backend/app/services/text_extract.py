@@ -1,17 +1,28 @@
 from __future__ import annotations
 
 from io import BytesIO
-from pypdf import PdfReader
+from typing import Callable
 
-def extract_text(data: bytes, content_type: str, filename: str) -> str:
+def extract_text(
+    data: bytes,
+    content_type: str,
+    filename: str,
+    on_page: Callable[[int, int], None] | None = None,
+) -> str:
     ct = (content_type or "").lower()
     name = (filename or "").lower()
 
     if "pdf" in ct or name.endswith(".pdf"):
+        # Lazy: pypdf is only needed by ingest workers, not by every process importing this module.
+        from pypdf import PdfReader
+
         reader = PdfReader(BytesIO(data))
         parts: list[str] = []
-        for page in reader.pages:
+        total = len(reader.pages)
+        for i, page in enumerate(reader.pages, start=1):
             parts.append(page.extract_text() or "")
+            if on_page:
+                on_page(i, total)
         return "\n".join(parts)
 
     # OpenAPI YAML/JSON or general text
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import bisect
+import re
+
+from app.core.config import settings
+
+# Used when tiktoken is not installed or its BPE file cannot be loaded (it is downloaded on first use,
+# see the Dockerfile). Every piece is one token: up to 4 ASCII word characters, or any single other
+# non-space character (punctuation, CJK, accented letters). BPE never packs more than that into a token
+# for ASCII words and usually spends at least one token per non-ASCII character, so this overestimates
+# and token budgets still hold; capping the piece length also lets long unbroken runs (base64, hashes,
+# URLs) be split.
+_PIECE = re.compile(r"[A-Za-z0-9_]{1,4}|[^\sA-Za-z0-9_]")
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+
+            try:
+                _encoding = tiktoken.encoding_for_model(settings.openai_embed_model)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # ImportError, or no network to fetch the BPE file
+            _encoding = None
+    return _encoding
+
+
+def _approx_pieces(text: str) -> list[tuple[int, int]]:
+    """(start, end) per one-token piece."""
+    return [m.span() for m in _PIECE.finditer(text)]
+
+
+def count_tokens(text: str) -> int:
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return len(_approx_pieces(text))
+
+
+def split_tokens(text: str, max_tokens: int, overlap: int = 0) -> list[str]:
+    """Hard split into windows of at most max_tokens, each starting `overlap` tokens before the previous end."""
+    step = max(1, max_tokens - overlap)
+    enc = _get_encoding()
+    if enc is not None:
+        # Cut at the character offsets of token starts: decoding a slice of ids that splits a multi-byte
+        # character would yield U+FFFD replacement characters, which re-encode to more tokens.
+        ids = enc.encode(text, disallowed_special=())
+        bounds = enc.decode_with_offsets(ids)[1] + [len(text)]
+        out: list[str] = []
+        i = 0
+        while i < len(ids):
+            start, end = bounds[i], bounds[min(i + max_tokens, len(ids))]
+            # Re-encoding a slice can merge differently at its edges; trim until it fits.
+            while end > start + 1 and count_tokens(text[start:end]) > max_tokens:
+                end -= 1
+            out.append(text[start:end])
+            if end >= len(text):
+                break
+            # Next window starts `overlap` tokens back, and never after this one's (possibly trimmed) end.
+            i = max(i + 1, min(i + step, bisect.bisect_right(bounds, end) - 1))
+        return out
+
+    # Windows run from the start of their first piece to the start of the next window's, so whitespace
+    # between pieces is kept.
+    pieces = _approx_pieces(text)
+    bounds = [0] + [p[0] for p in pieces[1:]] + [len(text)]
+    return [
+        text[bounds[i]:bounds[min(i + max_tokens, len(pieces))]]
+        for i in range(0, len(pieces), step)
+        if i == 0 or i + overlap < len(pieces)
+    ]
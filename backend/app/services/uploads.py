@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+# Uploaded bytes are kept in Redis under the document id, so the ingest job payload stays small no matter how
+# often the job is retried.
+
+
+def _key(document_id: str) -> str:
+    return f"uploads:{document_id}"
+
+
+def store_upload(document_id: str, data: bytes) -> None:
+    get_redis().set(_key(document_id), data, ex=settings.upload_ttl_s)
+
+
+def load_upload(document_id: str) -> bytes | None:
+    return get_redis().get(_key(document_id))
+
+
+def delete_upload(document_id: str) -> None:
+    get_redis().delete(_key(document_id))
@@ -1,10 +1,30 @@
+import time
+
+import redis
 from celery import Celery
+from prometheus_client import REGISTRY
+from celery.signals import before_task_publish, task_prerun, task_postrun, worker_ready
 from app.core.config import settings
+from app.core.telemetry import end_remote_span, inject_context, metrics_registry, start_remote_span
+from app.services.progress import publish_progress
+from app.tasks.queues import (
+    ENQUEUED_AT_HEADER,
+    INGEST_QUEUE,
+    PRIORITY_SEP,
+    PRIORITY_STEPS,
+    TASK_QUEUES,
+    TASK_ROUTES,
+    VISIBILITY_TIMEOUT_S,
+    record_wait,
+)
 
 celery = Celery(
     "ai_test_copilot",
     broker=settings.redis_url,
     backend=settings.redis_url,
+    # Imported by workers at startup only; API processes publish by name and never load the task
+    # modules (and with them pypdf, the OpenAI SDK and the generation code).
+    include=["app.tasks.ingest_tasks", "app.tasks.plan_tasks", "app.tasks.maintenance_tasks"],
 )
 
 celery.conf.update(
@@ -14,6 +34,73 @@ celery.conf.update(
     accept_content=["json"],
     timezone="UTC",
     enable_utc=True,
+    task_queues=TASK_QUEUES,
+    task_default_queue=INGEST_QUEUE,
+    task_routes=TASK_ROUTES,
+    task_default_priority=3,
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": PRIORITY_STEPS,
+        "sep": PRIORITY_SEP,
+        "visibility_timeout": VISIBILITY_TIMEOUT_S,
+    },
+    # Ack after the task finishes and hold one message per process at a time, so a long plan
+    # never sits on prefetched ingest jobs. Per-queue concurrency is set on each worker (-Q/-c).
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
 )
 
-from app.tasks import ingest_tasks, plan_tasks
\ No newline at end of file
+# Open task spans by task id; closed in task_postrun.
+_task_spans: dict[str, object] = {}
+
+@before_task_publish.connect
+def _stamp_enqueued_at(headers=None, **_):
+    if headers is not None:
+        headers.setdefault(ENQUEUED_AT_HEADER, time.time())
+        # Trace context of the publishing request/task, picked up by the worker in task_prerun.
+        inject_context(headers)
+
+@worker_ready.connect
+def _start_metrics_server(**_):
+    if settings.metrics_enabled:
+        from prometheus_client import start_http_server
+
+        start_http_server(settings.worker_metrics_port, registry=metrics_registry() or REGISTRY)
+
+@task_prerun.connect
+def _publish_started(task_id=None, task=None, **_):
+    publish_progress(task_id, "started", state="STARTED")
+    if task:
+        handle = start_remote_span(f"celery.task {task.name}", task.request, kind="consumer")
+        if handle:
+            _task_spans[task_id] = handle
+    enqueued_at = task.request.get(ENQUEUED_AT_HEADER) if task else None
+    queue = (task.request.delivery_info or {}).get("routing_key") if task else None
+    # Only the first delivery: a retry (e.g. waiting for a project slot) is re-published with a fresh stamp
+    # and would add a sample per retry; those jobs show up as waiting_for_slot instead.
+    if enqueued_at and queue and not task.request.retries:
+        try:
+            record_wait(queue, float(enqueued_at))
+        except redis.RedisError:
+            pass
+
+@task_postrun.connect
+def _publish_finished(task_id=None, state=None, retval=None, **_):
+    end_remote_span(_task_spans.pop(task_id, None), retval if isinstance(retval, BaseException) else None)
+    # A retried task runs again: not a terminal event, so SSE clients keep listening.
+    if state == "RETRY":
+        publish_progress(task_id, "retrying", state=state, reason=str(retval))
+        return
+    # Runs after the result is stored, so clients reacting to this event see the final status.
+    if state == "SUCCESS":
+        publish_progress(task_id, "finished", state=state, result=retval)
+    else:
+        publish_progress(task_id, "finished", state=state, error=str(retval))
+
+def enqueue(name: str, *args, **kwargs):
+    """Publish a task by name. Under task_always_eager (benchmarks) it runs inline like .delay() would."""
+    if celery.conf.task_always_eager:
+        celery.loader.import_default_modules()
+        return celery.tasks[name].apply(args, kwargs)
+    return celery.send_task(name, args, kwargs)
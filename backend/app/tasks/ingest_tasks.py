@@ -2,51 +2,124 @@ from __future__ import annotations
 
 import uuid
 from celery import shared_task
+from celery.exceptions import Retry
 from sqlalchemy import delete
 
-from app.tasks.celery_app import celery
+from app.tasks.celery_app import celery, enqueue
 from app.db.session import SessionLocal
 from app.db.models import Document, Chunk
+from app.db.partitioning import hold_swap, project_rows_in_default
 from app.core.config import settings
+from app.core.telemetry import observe_batch, span
 from app.services.text_extract import extract_text
-from app.services.chunking import chunk_text
-from app.services.embeddings import embed_texts
+from app.services.chunking import chunk_document, chunk_strategy_for, content_hash
+from app.services.embeddings import embed_texts, token_batches
+from app.services.progress import publish_progress
+from app.services.uploads import delete_upload, load_upload
+from app.tasks.limits import acquire_project_slot
+from app.tasks.queues import INGEST_TASK, INGEST_TIME_LIMITS, PROMOTE_CHUNKS_TASK, claim_promote_pending
 
-@celery.task(name="ingest_document_task")
-def ingest_document_task(document_id: str, data: bytes, content_type: str, filename: str):
+# Publish page progress every N pages; large PDFs would otherwise flood the channel.
+PAGE_PROGRESS_EVERY = 10
+
+def _mark_failed(db, document_id: str) -> None:
+    db.rollback()
+    doc = db.get(Document, uuid.UUID(document_id))
+    if doc and doc.status != "ready":
+        doc.status = "failed"
+        db.commit()
+
+@celery.task(
+    name=INGEST_TASK,
+    bind=True,
+    max_retries=settings.project_slot_max_retries,
+    soft_time_limit=INGEST_TIME_LIMITS[0],
+    time_limit=INGEST_TIME_LIMITS[1],
+)
+def ingest_document_task(self, document_id: str, data: bytes | None, content_type: str, filename: str):
+    # data is None when the API stored the upload in Redis (see app.services.uploads), so retries while
+    # waiting for a project slot re-publish only the document id.
     db = SessionLocal()
+    slot = None
     try:
         did = uuid.UUID(document_id)
         doc = db.get(Document, did)
         if not doc:
             raise ValueError("Document not found")
 
-        # Clear prior chunks if re-ingesting
-        db.execute(delete(Chunk).where(Chunk.document_id == did))
+        slot = acquire_project_slot(self, doc.project_id, lease_s=INGEST_TIME_LIMITS[1])
+        if data is None:
+            data = load_upload(document_id)
+            if data is None:
+                raise ValueError("Upload expired before it was ingested (UPLOAD_TTL_S)")
+
+        # Clear prior chunks if re-ingesting (project_id lets Postgres prune to the project's partition)
+        if settings.chunk_partitioning:
+            hold_swap(db, doc.project_id)
+        db.execute(delete(Chunk).where(Chunk.project_id == doc.project_id, Chunk.document_id == did))
         db.commit()
 
-        text = extract_text(data, content_type, filename)
-        chunks = chunk_text(text, chunk_size=settings.chunk_size, overlap=settings.chunk_overlap)
+        job_id = self.request.id
+
+        def on_page(page: int, total: int) -> None:
+            if page % PAGE_PROGRESS_EVERY == 0 or page == total:
+                publish_progress(job_id, "extracting", pages_done=page, pages_total=total)
 
-        # Embed in batches (keep it simple)
+        with span("ingest.extract_text", content_type=content_type, bytes=len(data)):
+            text = extract_text(data, content_type, filename, on_page=on_page)
+        publish_progress(job_id, "extracted", chars=len(text))
+        strategy = chunk_strategy_for(content_type, filename)
+        with span("ingest.chunk_text", chars=len(text), strategy=strategy):
+            pieces = chunk_document(text, content_type, filename)
+        chunks = [p["text"] for p in pieces]
+        publish_progress(job_id, "chunked", chunks_total=len(chunks), tokens_total=sum(p["tokens"] for p in pieces))
+
+        # Embed in token-budgeted batches: fewer requests for small chunks, no oversized ones for large.
         embeddings: list[list[float]] = []
-        B = 64
-        for i in range(0, len(chunks), B):
-            embeddings.extend(embed_texts(chunks[i:i+B]))
-
-        for idx, (ctext, emb) in enumerate(zip(chunks, embeddings)):
-            row = Chunk(
-                project_id=doc.project_id,
-                document_id=doc.id,
-                idx=idx,
-                text=ctext,
-                embedding=emb,
-                meta={"filename": doc.filename},
-            )
-            db.add(row)
-
-        doc.status = "ready"
-        db.commit()
+        batches = token_batches(
+            [p["tokens"] for p in pieces], settings.embed_batch_max_tokens, settings.embed_batch_max_inputs
+        )
+        with span("ingest.embed", chunks=len(chunks), batches=len(batches)):
+            for start, end in batches:
+                embeddings.extend(embed_texts(chunks[start:end]))
+                publish_progress(job_id, "embedding", chunks_embedded=len(embeddings), chunks_total=len(chunks))
+
+        observe_batch("ingest.db_insert", len(chunks))
+        with span("ingest.db_insert", chunks=len(chunks)):
+            if settings.chunk_partitioning:
+                hold_swap(db, doc.project_id)
+            for idx, (piece, emb) in enumerate(zip(pieces, embeddings)):
+                row = Chunk(
+                    project_id=doc.project_id,
+                    document_id=doc.id,
+                    idx=idx,
+                    text=piece["text"],
+                    embedding=emb,
+                    meta={"filename": doc.filename, "headings": piece["headings"], "tokens": piece["tokens"]},
+                    content_hash=content_hash(piece["text"]),
+                )
+                db.add(row)
+
+            doc.status = "ready"
+            db.commit()
+        delete_upload(document_id)
+
+        if (
+            settings.chunk_partitioning
+            and project_rows_in_default(db, doc.project_id) >= settings.chunk_partition_min_rows
+            and claim_promote_pending(str(doc.project_id))
+        ):
+            enqueue(PROMOTE_CHUNKS_TASK, str(doc.project_id))
         return {"document_id": document_id, "chunks": len(chunks), "status": doc.status}
+    except Retry:
+        raise
+    except Exception:
+        # Out of slot retries, expired upload, extraction/embedding errors: the document must not stay
+        # "ingesting" forever.
+        _mark_failed(db, document_id)
+        delete_upload(document_id)
+        raise
     finally:
+        if slot:
+            slot.release()
         db.close()
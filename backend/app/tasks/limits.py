@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import random
+import time
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.services.progress import publish_progress
+from app.tasks.queues import clear_slot_waiting, mark_slot_waiting
+
+# Retry delay for a task that found its project at capacity: doubles per retry up to the cap, with jitter so
+# jobs queued together do not retry in lockstep. The number of retries is the task's max_retries
+# (settings.project_slot_max_retries).
+SLOT_RETRY_S = 5
+SLOT_RETRY_MAX_S = 60
+
+
+class ProjectBusyError(Exception):
+    """The project stayed at capacity for all of the task's retries."""
+
+# Slots are members of a sorted set scored by lease expiry. Expired leases are evicted before
+# counting, so a crashed worker cannot hold a slot forever.
+_ACQUIRE = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local expires = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+if not redis.call('ZSCORE', key, ARGV[4]) and redis.call('ZCARD', key) >= limit then
+  return 0
+end
+redis.call('ZADD', key, expires, ARGV[4])
+local latest = redis.call('ZRANGE', key, -1, -1, 'WITHSCORES')
+redis.call('EXPIREAT', key, math.ceil(tonumber(latest[2])))
+return 1
+"""
+
+
+class ProjectSemaphore:
+    """Redis-backed counting semaphore capping concurrent jobs per project (across all workers)."""
+
+    def __init__(self, project_id: str, token: str, limit: int, lease_s: float):
+        self.key = f"projects:{project_id}:job_slots"
+        self.token = token
+        self.limit = limit
+        self.lease_s = lease_s
+        self._script = get_redis().register_script(_ACQUIRE)
+
+    def acquire(self) -> bool:
+        now = time.time()
+        return bool(self._script(keys=[self.key], args=[now, self.limit, now + self.lease_s, self.token]))
+
+    def release(self) -> None:
+        get_redis().zrem(self.key, self.token)
+
+
+def slot_retry_delay(retries: int) -> float:
+    return min(SLOT_RETRY_MAX_S, SLOT_RETRY_S * 2 ** retries) * random.uniform(0.8, 1.2)
+
+
+def acquire_project_slot(task, project_id, lease_s: float) -> ProjectSemaphore:
+    """
+    Take one of the project's job slots or re-queue the task with backoff (raises celery's Retry). Raises
+    ProjectBusyError once the task's max_retries are used up.
+    """
+    task_id = task.request.id
+    queue = (task.request.delivery_info or {}).get("routing_key")
+    slot = ProjectSemaphore(str(project_id), task_id, settings.project_max_concurrent_jobs, lease_s)
+    if slot.acquire():
+        clear_slot_waiting(queue, task_id)
+        return slot
+
+    retries = task.request.retries
+    if task.max_retries is not None and retries >= task.max_retries:
+        clear_slot_waiting(queue, task_id)
+        raise ProjectBusyError(f"project {project_id} stayed at capacity for {retries} retries")
+    countdown = slot_retry_delay(retries)
+    mark_slot_waiting(queue, task_id, retry_at=time.time() + countdown)
+    publish_progress(task_id, "waiting_for_project_slot", retries=retries, retry_in_s=round(countdown, 1))
+    raise task.retry(countdown=countdown)
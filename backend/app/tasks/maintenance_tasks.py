@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import uuid
+
+from app.db.partitioning import promote_project
+from app.tasks.celery_app import celery
+from app.tasks.queues import MAINTENANCE_TIME_LIMITS, PROMOTE_CHUNKS_TASK, clear_promote_pending
+
+@celery.task(
+    name=PROMOTE_CHUNKS_TASK,
+    soft_time_limit=MAINTENANCE_TIME_LIMITS[0],
+    time_limit=MAINTENANCE_TIME_LIMITS[1],
+)
+def promote_project_chunks_task(project_id: str):
+    # Idempotent: a no-op if the partition exists or another promotion of the project is running.
+    try:
+        return promote_project(uuid.UUID(project_id))
+    finally:
+        clear_promote_pending(project_id)
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
 import uuid
+from app.core.config import settings
 from app.tasks.celery_app import celery
 from app.db.session import SessionLocal
-from app.services.test_plan import generate_test_plan
+from app.services.test_plan import generate_test_plan, generate_test_plan_incremental
+from app.tasks.limits import acquire_project_slot
+from app.tasks.queues import PLAN_TASK, PLAN_TIME_LIMITS
 
-@celery.task(name="generate_test_plan_task")
-def generate_test_plan_task(project_id: str):
+@celery.task(
+    name=PLAN_TASK,
+    bind=True,
+    max_retries=settings.project_slot_max_retries,
+    soft_time_limit=PLAN_TIME_LIMITS[0],
+    time_limit=PLAN_TIME_LIMITS[1],
+)
+def generate_test_plan_task(self, project_id: str, incremental: bool = False):
+    pid = uuid.UUID(project_id)
+    slot = acquire_project_slot(self, pid, lease_s=PLAN_TIME_LIMITS[1])
     db = SessionLocal()
     try:
-        pid = uuid.UUID(project_id)
-        job_id = generate_test_plan_task.request.id  # Celery job id
-        plan = generate_test_plan(db, pid, job_id=job_id)
+        job_id = self.request.id  # Celery job id
+        if incremental:
+            plan = generate_test_plan_incremental(db, pid, job_id=job_id)
+        else:
+            plan = generate_test_plan(db, pid, job_id=job_id)
         return {"project_id": project_id, "tests": len(plan.get("tests", []))}
     finally:
+        slot.release()
         db.close()
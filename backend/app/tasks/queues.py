@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import time
+
+from kombu import Queue
+
+from app.core.redis_client import get_redis
+
+INGEST_QUEUE = "ingest"
+PLAN_QUEUE = "plan"
+MAINTENANCE_QUEUE = "maintenance"
+QUEUE_NAMES = [INGEST_QUEUE, PLAN_QUEUE, MAINTENANCE_QUEUE]
+
+TASK_QUEUES = tuple(Queue(name, routing_key=name) for name in QUEUE_NAMES)
+
+# Task names. The API publishes by name (celery.send_task) so it never imports the task modules.
+INGEST_TASK = "ingest_document_task"
+PLAN_TASK = "generate_test_plan_task"
+PROMOTE_CHUNKS_TASK = "maintenance.promote_project_chunks"
+
+# Redis has no native priorities: kombu splits each queue into one list per step
+# ("<queue>", "<queue>:3", ...) and drains lower numbers first (0 = most urgent).
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_SEP = ":"
+
+TASK_ROUTES = {
+    INGEST_TASK: {"queue": INGEST_QUEUE, "priority": 3},
+    PLAN_TASK: {"queue": PLAN_QUEUE, "priority": 3},
+    "maintenance.*": {"queue": MAINTENANCE_QUEUE, "priority": 9},
+}
+
+# (soft, hard) time limits in seconds. The hard limit doubles as the project slot lease,
+# so a worker killed mid-task frees its slot once the lease runs out.
+INGEST_TIME_LIMITS = (600, 660)
+PLAN_TIME_LIMITS = (300, 360)
+# Partition promotion copies a project's chunks and builds its HNSW index.
+MAINTENANCE_TIME_LIMITS = (3000, 3300)
+
+# Unacked messages are redelivered after this long (acks_late); must exceed the longest hard limit.
+VISIBILITY_TIMEOUT_S = 3600
+
+# Recent queue wait samples kept per queue for the metrics endpoint.
+WAIT_SAMPLES = 1000
+ENQUEUED_AT_HEADER = "enqueued_at"
+
+
+def _wait_key(queue: str) -> str:
+    return f"queues:{queue}:wait_s"
+
+
+def _slot_waiting_key(queue: str) -> str:
+    return f"queues:{queue}:slot_waiting"
+
+
+def _queue_keys(queue: str) -> list[str]:
+    return [queue if p == 0 else f"{queue}{PRIORITY_SEP}{p}" for p in PRIORITY_STEPS]
+
+
+def record_wait(queue: str, enqueued_at: float) -> None:
+    wait = max(0.0, time.time() - enqueued_at)
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.lpush(_wait_key(queue), f"{wait:.3f}")
+    pipe.ltrim(_wait_key(queue), 0, WAIT_SAMPLES - 1)
+    pipe.execute()
+
+
+# Jobs retrying for a project slot sit in the broker as scheduled (unacked) messages, which the queue
+# lists do not show; they are tracked here by task id, scored by when their retry is due.
+SLOT_WAITING_GRACE_S = 120
+
+
+def mark_slot_waiting(queue: str | None, task_id: str, retry_at: float) -> None:
+    if queue:
+        get_redis().zadd(_slot_waiting_key(queue), {task_id: retry_at})
+
+
+def clear_slot_waiting(queue: str | None, task_id: str) -> None:
+    if queue:
+        get_redis().zrem(_slot_waiting_key(queue), task_id)
+
+
+# At most one promotion per project is queued: ingests past the row threshold skip the enqueue while this key is
+# set. The task clears it when it finishes; the TTL covers a message that was lost.
+def _promote_pending_key(project_id: str) -> str:
+    return f"queues:{MAINTENANCE_QUEUE}:promote_pending:{project_id}"
+
+
+def claim_promote_pending(project_id: str) -> bool:
+    """True if the caller should enqueue the promotion (no other one is pending)."""
+    return bool(get_redis().set(_promote_pending_key(project_id), 1, nx=True, ex=VISIBILITY_TIMEOUT_S))
+
+
+def clear_promote_pending(project_id: str) -> None:
+    get_redis().delete(_promote_pending_key(project_id))
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def queue_metrics() -> dict:
+    # Entries whose retry is long overdue belong to jobs that were lost or revoked.
+    stale_before = time.time() - SLOT_WAITING_GRACE_S
+    pipe = get_redis().pipeline(transaction=False)
+    for q in QUEUE_NAMES:
+        for key in _queue_keys(q):
+            pipe.llen(key)
+        pipe.zremrangebyscore(_slot_waiting_key(q), "-inf", stale_before)
+        pipe.zcard(_slot_waiting_key(q))
+        pipe.lrange(_wait_key(q), 0, -1)
+    res = pipe.execute()
+
+    out = {}
+    n_keys = len(PRIORITY_STEPS)
+    step = n_keys + 3
+    for i, q in enumerate(QUEUE_NAMES):
+        part = res[i * step:(i + 1) * step]
+        waits = [float(w) for w in part[-1]]
+        out[q] = {
+            "depth": sum(part[:n_keys]),
+            "waiting_for_slot": part[n_keys + 1],
+            "wait_s": {
+                "samples": len(waits),
+                "p50": _percentile(waits, 0.5),
+                "p95": _percentile(waits, 0.95),
+                "max": max(waits) if waits else None,
+            },
+        }
+    return out
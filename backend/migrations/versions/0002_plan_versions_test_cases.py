@@ -0,0 +1,88 @@
+"""plan versions, test case rows and pagination indexes
+
+Chunk content hashes and plan versioning for incremental regeneration, the test_cases table, and the keyset
+pagination / latest-plan indexes. Indexes on the existing tables are built CONCURRENTLY so upgrading a live
+database does not block writes.
+
+Revision ID: 0002_plan_versions_test_cases
+Revises: 0001_initial
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0002_plan_versions_test_cases"
+down_revision: Union[str, None] = "0001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chunks", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+    # Existing plans become version 1 of their project's history.
+    op.add_column("test_plans", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+    op.add_column("test_plans", sa.Column("base_plan_id", sa.UUID(), nullable=True))
+    op.add_column("test_plans", sa.Column("diff", sa.JSON(), nullable=True))
+    op.add_column("test_plans", sa.Column("source_hashes", sa.JSON(), nullable=True))
+
+    op.create_table(
+        "test_cases",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("plan_id", sa.UUID(), nullable=False),
+        sa.Column("project_id", sa.UUID(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("test_id", sa.String(length=50), nullable=False),
+        sa.Column("priority", sa.String(length=10), nullable=True),
+        sa.Column("type", sa.String(length=30), nullable=True),
+        sa.Column("title", sa.Text(), nullable=False),
+        sa.Column("endpoint", sa.String(length=300), nullable=True),
+        sa.Column("tags", postgresql.JSONB(), nullable=False),
+        sa.Column("sources", postgresql.JSONB(), nullable=False),
+        sa.Column("body", postgresql.JSONB(), nullable=False),
+        sa.ForeignKeyConstraint(["plan_id"], ["test_plans.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_test_cases_project_id", "test_cases", ["project_id"])
+    op.create_index("ix_test_cases_plan_id_position", "test_cases", ["plan_id", "position"])
+    op.create_index("ix_test_cases_plan_id_priority_type", "test_cases", ["plan_id", "priority", "type"])
+    op.create_index("ix_test_cases_tags", "test_cases", ["tags"], postgresql_using="gin")
+    op.create_index("ix_test_cases_sources", "test_cases", ["sources"], postgresql_using="gin")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chunks_content_hash", "chunks", ["content_hash"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_projects_created_at_id", "projects", ["created_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_documents_project_id_created_at_id", "documents", ["project_id", "created_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_test_plans_project_id_created_at",
+            "test_plans",
+            ["project_id", sa.literal_column("created_at DESC")],
+            postgresql_include=["id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_test_plans_project_id_created_at", table_name="test_plans")
+    op.drop_index("ix_documents_project_id_created_at_id", table_name="documents")
+    op.drop_index("ix_projects_created_at_id", table_name="projects")
+    op.drop_index("ix_chunks_content_hash", table_name="chunks")
+    op.drop_table("test_cases")
+    op.drop_column("test_plans", "source_hashes")
+    op.drop_column("test_plans", "diff")
+    op.drop_column("test_plans", "base_plan_id")
+    op.drop_column("test_plans", "version")
+    op.drop_column("chunks", "content_hash")
@@ -0,0 +1,29 @@
+"""drop ix_test_plans_project_id
+
+project_id is the leading column of ix_test_plans_project_id_created_at, which serves every lookup the
+single-column index did.
+
+Revision ID: 0003_drop_test_plans_project_id_index
+Revises: 0002_plan_versions_test_cases
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003_drop_test_plans_project_id_index"
+down_revision: Union[str, None] = "0002_plan_versions_test_cases"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_test_plans_project_id", table_name="test_plans", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_test_plans_project_id", "test_plans", ["project_id"], postgresql_concurrently=True, if_not_exists=True
+        )
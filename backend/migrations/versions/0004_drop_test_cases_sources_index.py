@@ -0,0 +1,30 @@
+"""drop ix_test_cases_sources
+
+Nothing filters test cases by source, so the GIN index only added write cost to the bulk insert of a plan's
+test cases.
+
+Revision ID: 0004_drop_test_cases_sources_index
+Revises: 0003_drop_test_plans_project_id_index
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004_drop_test_cases_sources_index"
+down_revision: Union[str, None] = "0003_drop_test_plans_project_id_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_test_cases_sources", table_name="test_cases", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_test_cases_sources", "test_cases", ["sources"],
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
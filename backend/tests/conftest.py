@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Settings require these; unit tests never connect to them.
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://unused@localhost/unused")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
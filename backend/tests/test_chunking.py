@@ -0,0 +1,72 @@
+import base64
+import random
+
+import pytest
+
+from app.services import tokens
+from app.services.chunking import chunk_markdown
+from app.services.tokens import count_tokens, split_tokens
+
+MAX_TOKENS = 64
+OVERLAP = 8
+
+
+def _byte_encoding():
+    """Byte-level tiktoken encoding, for when the real BPE file cannot be downloaded."""
+    tiktoken = pytest.importorskip("tiktoken")
+    return tiktoken.Encoding(
+        name="test-bytes",
+        pat_str=r"""\S+|\s+""",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+
+
+@pytest.fixture(params=["approx", "tiktoken"])
+def mode(request, monkeypatch):
+    if request.param == "approx":
+        encoding = None
+    else:
+        monkeypatch.setattr(tokens, "_encoding_loaded", False)
+        encoding = tokens._get_encoding() or _byte_encoding()
+    monkeypatch.setattr(tokens, "_encoding", encoding)
+    monkeypatch.setattr(tokens, "_encoding_loaded", True)
+    return request.param
+
+
+def _samples() -> dict[str, str]:
+    rnd = random.Random(7)
+    return {
+        "base64": base64.b64encode(rnd.randbytes(3000)).decode(),
+        "cjk": "要件定義書のテキスト。" * 200,
+        "prose": " ".join(rnd.choice(["login", "token", "expires", "after", "idle", "session"]) for _ in range(1500)),
+        "url": "https://example.com/" + "a" * 3000,
+    }
+
+
+@pytest.mark.parametrize("name", list(_samples()))
+def test_split_tokens_bounded(mode, name):
+    text = _samples()[name]
+    parts = split_tokens(text, MAX_TOKENS, OVERLAP)
+    assert len(parts) > 1
+    assert all(count_tokens(p) <= MAX_TOKENS for p in parts)
+    assert parts[0] == text[:len(parts[0])]
+    assert parts[-1] == text[-len(parts[-1]):]
+    assert "".join(split_tokens(text, MAX_TOKENS)) == text
+
+
+@pytest.mark.parametrize("name", list(_samples()))
+def test_chunk_markdown_bounded(mode, name):
+    text = f"# Spec\n\n## Section\n\n{_samples()[name]}\n\n| a | b |\n|---|---|\n" + "| x | y |\n" * 100
+    chunks = chunk_markdown(text, max_tokens=MAX_TOKENS, overlap=OVERLAP)
+    assert chunks
+    for c in chunks:
+        assert c["tokens"] == count_tokens(c["text"])
+        assert c["tokens"] <= MAX_TOKENS
+
+
+def test_approx_counts_non_ascii_per_character(mode):
+    if mode != "approx":
+        pytest.skip("approximation only")
+    assert count_tokens("日本語") == 3
+    assert count_tokens("a" * 400) == 100
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.tasks import limits
+
+
+class _Retry(Exception):
+    pass
+
+
+class _Task:
+    def __init__(self, retries: int, max_retries: int | None = 3):
+        self.request = SimpleNamespace(id="job-1", retries=retries, delivery_info={"routing_key": "ingest"})
+        self.max_retries = max_retries
+        self.countdown = None
+
+    def retry(self, countdown=None, **_):
+        self.countdown = countdown
+        return _Retry()
+
+
+@pytest.fixture
+def busy(monkeypatch):
+    """Project always at capacity; records slot-waiting bookkeeping instead of touching Redis."""
+    calls = []
+    monkeypatch.setattr(limits.ProjectSemaphore, "__init__", lambda self, *a: None)
+    monkeypatch.setattr(limits.ProjectSemaphore, "acquire", lambda self: False)
+    monkeypatch.setattr(limits, "mark_slot_waiting", lambda q, t, retry_at: calls.append(("mark", q, t)))
+    monkeypatch.setattr(limits, "clear_slot_waiting", lambda q, t: calls.append(("clear", q, t)))
+    monkeypatch.setattr(limits, "publish_progress", lambda *a, **k: None)
+    return calls
+
+
+def test_retry_delay_backs_off_to_cap():
+    delays = [limits.slot_retry_delay(r) for r in range(10)]
+    assert limits.SLOT_RETRY_S * 0.8 <= delays[0] <= limits.SLOT_RETRY_S * 1.2
+    assert all(d <= limits.SLOT_RETRY_MAX_S * 1.2 for d in delays)
+    assert delays[-1] >= limits.SLOT_RETRY_MAX_S * 0.8
+
+
+def test_busy_project_retries_then_fails(busy):
+    task = _Task(retries=1)
+    with pytest.raises(_Retry):
+        limits.acquire_project_slot(task, "p1", lease_s=60)
+    assert task.countdown >= limits.SLOT_RETRY_S * 2 * 0.8
+    assert busy == [("mark", "ingest", "job-1")]
+
+    with pytest.raises(limits.ProjectBusyError):
+        limits.acquire_project_slot(_Task(retries=3), "p1", lease_s=60)
+    assert busy[-1] == ("clear", "ingest", "job-1")
@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import DEFAULT_LIMIT, MAX_LIMIT, clamp_limit, decode_cursor, encode_cursor, parse_fields
+
+
+def test_clamp_limit():
+    assert clamp_limit(None) == DEFAULT_LIMIT
+    assert clamp_limit(1) == 1
+    assert clamp_limit(MAX_LIMIT + 1) == MAX_LIMIT
+    for bad in (0, -5):
+        with pytest.raises(HTTPException) as e:
+            clamp_limit(bad)
+        assert e.value.status_code == 422
+
+
+def test_parse_fields():
+    allowed = ["id", "name", "created_at"]
+    assert parse_fields(None, allowed) == allowed
+    assert parse_fields(" name, id ", allowed) == ["name", "id"]
+    for bad in (",", " , ", "name,bogus"):
+        with pytest.raises(HTTPException) as e:
+            parse_fields(bad, allowed)
+        assert e.value.status_code == 400
+
+
+def test_cursor_round_trip():
+    created, id = datetime(2025, 1, 2, 3, 4, 5, 678), uuid.uuid4()
+    assert decode_cursor(encode_cursor(created, id)) == (created, id)
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,182 @@
+"""
+Integration tests for chunk partitioning. They need Postgres with pgvector and create and drop the schema, so
+point TEST_DATABASE_URL at a throwaway database; skipped otherwise.
+"""
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.core.config import settings
+from app.db import partitioning
+from app.db.models import Base
+
+DB_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DB_URL, reason="TEST_DATABASE_URL not set")
+
+BIG, SMALL = uuid.uuid4(), uuid.uuid4()
+
+
+class _SwapSet:
+    """Stands in for the Redis sorted set of swap announcements."""
+
+    def __init__(self):
+        self.members = {}
+
+    def zadd(self, key, mapping):
+        self.members.update(mapping)
+
+    def zrem(self, key, member):
+        self.members.pop(member, None)
+
+
+def _reset(engine) -> None:
+    with engine.begin() as conn:
+        parts = conn.execute(text("SELECT tablename FROM pg_tables WHERE tablename LIKE 'chunks_p_%'")).scalars().all()
+        for name in [*parts, "chunks", "chunks_default"]:
+            conn.execute(text(f"DROP TABLE IF EXISTS {name} CASCADE"))
+    Base.metadata.drop_all(engine)
+
+
+def _insert_chunk(conn, project_id: uuid.UUID, document_id: uuid.UUID, idx: int) -> None:
+    vec = "[" + ",".join("1" if i == idx % settings.embedding_dim else "0" for i in range(settings.embedding_dim)) + "]"
+    conn.execute(
+        text(
+            "INSERT INTO chunks (id, project_id, document_id, idx, text, embedding, meta) "
+            "VALUES (:id, :p, :d, :i, :t, CAST(:e AS vector), '{}')"
+        ),
+        {"id": uuid.uuid4(), "p": project_id, "d": document_id, "i": idx, "t": f"chunk {idx}", "e": vec},
+    )
+
+
+def _count(engine, table: str, project_id: uuid.UUID) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT count(*) FROM {table} WHERE project_id = :p"), {"p": project_id}).scalar()
+
+
+def _constraint(engine, table: str, name: str):
+    """None if absent, else whether it is validated."""
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT convalidated FROM pg_constraint WHERE conrelid = to_regclass(:t) AND conname = :n"),
+            {"t": table, "n": name},
+        ).scalar()
+
+
+@pytest.fixture
+def pg(monkeypatch):
+    engine = create_engine(DB_URL)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    except OperationalError as e:
+        pytest.skip(f"database unavailable: {e}")
+    _reset(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for project_id, n in ((BIG, 20), (SMALL, 5)):
+            document_id = uuid.uuid4()
+            conn.execute(text("INSERT INTO projects (id, name) VALUES (:p, 'p')"), {"p": project_id})
+            conn.execute(
+                text("INSERT INTO documents (id, project_id, filename) VALUES (:d, :p, 'f.md')"),
+                {"d": document_id, "p": project_id},
+            )
+            for i in range(n):
+                _insert_chunk(conn, project_id, document_id, i)
+
+    swaps = _SwapSet()
+    monkeypatch.setattr(partitioning, "engine", engine)
+    monkeypatch.setattr(partitioning, "get_redis", lambda: swaps)
+    monkeypatch.setattr(partitioning, "SWAP_NOTICE_S", 0.0)
+    monkeypatch.setattr(partitioning, "MOVE_BATCH_ROWS", 7)  # several batches for 20 rows
+    partitioning.enable_partitioning()
+    yield engine, swaps
+    _reset(engine)
+    engine.dispose()
+
+
+def test_enable_attaches_existing_table_as_default(pg):
+    engine, _ = pg
+    with engine.connect() as conn:
+        assert partitioning.is_partitioned(conn)
+        bound = conn.execute(
+            text("SELECT pg_get_expr(relpartbound, oid) FROM pg_class WHERE oid = to_regclass('chunks_default')")
+        ).scalar()
+    assert bound == "DEFAULT"
+    assert _count(engine, "chunks", BIG) == 20
+    partitioning.enable_partitioning()  # re-running is a no-op
+
+
+def test_promote_moves_rows_into_attached_partition(pg):
+    engine, swaps = pg
+    part = partitioning.partition_name(BIG)
+
+    result = partitioning.promote_project(BIG)
+
+    assert result["status"] == "promoted" and result["rows"] == 20
+    assert _count(engine, part, BIG) == 20
+    assert _count(engine, "chunks_default", BIG) == 0
+    assert _count(engine, "chunks", BIG) == 20
+    assert _count(engine, "chunks_default", SMALL) == 5
+    assert _constraint(engine, "chunks_default", partitioning._exclusion_name(BIG)) is None
+    assert _constraint(engine, part, f"{part}_project_check") is None
+    assert swaps.members == {}
+    assert partitioning.promote_project(BIG)["status"] == "exists"
+
+
+def test_not_valid_exclusion_blocks_new_rows_and_interrupted_promotion_resumes(pg, monkeypatch):
+    engine, _ = pg
+    exclusion = partitioning._exclusion_name(BIG)
+    finish_swap = partitioning._finish_swap
+
+    def crash(conn, project_id, m):
+        raise RuntimeError("worker killed after step 1")
+
+    monkeypatch.setattr(partitioning, "_finish_swap", crash)
+    with pytest.raises(RuntimeError):
+        partitioning.promote_project(BIG)
+
+    # Added NOT VALID: the project's existing rows are still there, but no new one gets in.
+    assert _constraint(engine, "chunks_default", exclusion) is False
+    assert _count(engine, "chunks_default", BIG) == 20
+    document_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO documents (id, project_id, filename) VALUES (:d, :p, 'g.md')"),
+            {"d": document_id, "p": BIG},
+        )
+    with pytest.raises(IntegrityError), engine.begin() as conn:
+        _insert_chunk(conn, BIG, document_id, 99)
+
+    monkeypatch.setattr(partitioning, "_finish_swap", finish_swap)
+    result = partitioning.promote_project(BIG)
+
+    assert result["status"] == "promoted" and result["rows"] == 20
+    assert _count(engine, "chunks", BIG) == 20
+    assert _constraint(engine, "chunks_default", exclusion) is None
+
+
+def test_failed_attach_moves_rows_back(pg, monkeypatch):
+    engine, swaps = pg
+    part = partitioning.partition_name(BIG)
+    seen = {}
+
+    def fail_attach(conn, project_id):
+        seen["validated"] = _constraint(engine, "chunks_default", partitioning._exclusion_name(BIG))
+        seen["moved"] = _count(engine, part, BIG)
+        raise RuntimeError("lock timeout")
+
+    monkeypatch.setattr(partitioning, "_attach", fail_attach)
+    with pytest.raises(RuntimeError):
+        partitioning.promote_project(BIG)
+
+    assert seen == {"validated": True, "moved": 20}
+    assert _count(engine, "chunks_default", BIG) == 20
+    assert _count(engine, "chunks", BIG) == 20
+    assert _constraint(engine, "chunks_default", partitioning._exclusion_name(BIG)) is None
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT to_regclass(:t)"), {"t": part}).scalar() is None
+    assert swaps.members == {}
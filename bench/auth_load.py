@@ -0,0 +1,141 @@
+"""
+Load test for the demo auth service: concurrent logins for a fixed duration, reporting latency percentiles per
+second so drift over time shows up.
+
+Each worker logs in from its own client address (sent as X-Forwarded-For, which uvicorn trusts from 127.0.0.1).
+User workers mix in a share of wrong passwords, but their next successful login resets the per-IP counter, so
+they only see 401s. The rate limiter is exercised by --attackers extra workers that only send wrong passwords
+from their own addresses and so run into 429s once they pass DEMO_AUTH_LOGIN_LIMIT.
+
+By default it serves only the demo auth router in-process with uvicorn, so no database is needed:
+
+    PYTHONPATH=backend DATABASE_URL=postgresql+psycopg://unused@localhost/x REDIS_URL=redis://localhost:6379/0 \\
+      python bench/auth_load.py --duration 20 --concurrency 32
+    # shared Redis store (needs Redis running)
+    DEMO_AUTH_BACKEND=redis ... python bench/auth_load.py
+
+or point it at a running API with --base-url http://localhost:8000 (started with --forwarded-allow-ips so the
+per-worker addresses are honoured; otherwise every worker shares one rate-limit bucket).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_in_process() -> str:
+    import uvicorn
+    from fastapi import FastAPI
+
+    from app.api.v1.demo_auth import router as demo_auth_router
+
+    app = FastAPI()
+    app.include_router(demo_auth_router, prefix="/api")
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def _pct(s: list[float], q: float) -> float:
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))] * 1000
+
+
+def summarize(samples: list[float]) -> dict:
+    s = sorted(samples)
+    if not s:
+        return {"n": 0}
+    return {"n": len(s), "mean_ms": statistics.fmean(s) * 1000, "p50_ms": _pct(s, 0.5), "p95_ms": _pct(s, 0.95), "p99_ms": _pct(s, 0.99)}
+
+
+def run(base_url: str, duration_s: float, concurrency: int, users: int, fail_every: int, attackers: int) -> dict:
+    with httpx.Client(base_url=base_url) as c:
+        for i in range(users):
+            c.post("/api/auth/register", json={"email": f"load{i}@example.com", "password": "Password123!"})
+
+    lock = threading.Lock()
+    per_second: dict[int, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter] = {"users": Counter(), "attackers": Counter()}
+    start = time.perf_counter()
+    deadline = start + duration_s
+
+    def worker(n: int) -> None:
+        attacker = n >= concurrency
+        role = "attackers" if attacker else "users"
+        headers = {"X-Forwarded-For": f"10.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}"}
+        i = 0
+        with httpx.Client(base_url=base_url, headers=headers) as c:
+            while time.perf_counter() < deadline:
+                i += 1
+                wrong = attacker or (fail_every and i % fail_every == 0)
+                password = "WrongPassword!" if wrong else "Password123!"
+                t0 = time.perf_counter()
+                r = c.post("/api/auth/login", json={"email": f"load{(n + i) % users}@example.com", "password": password})
+                if r.status_code == 200:
+                    c.get("/api/me", headers={"Authorization": f"Bearer {r.json()['token']}"})
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    if not attacker:
+                        per_second[int(t0 - start)].append(elapsed)
+                    statuses[role][r.status_code] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency + attackers) as pool:
+        list(pool.map(worker, range(concurrency + attackers)))
+
+    all_samples = [x for xs in per_second.values() for x in xs]
+    wall = time.perf_counter() - start
+    return {
+        "config": {
+            "duration_s": duration_s, "concurrency": concurrency, "users": users,
+            "fail_every": fail_every, "attackers": attackers,
+        },
+        "overall": summarize(all_samples),
+        "throughput_rps": len(all_samples) / wall,
+        "statuses": {role: dict(c) for role, c in statuses.items()},
+        "per_second": {sec: summarize(xs) for sec, xs in sorted(per_second.items())},
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--base-url")
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--users", type=int, default=100)
+    ap.add_argument("--fail-every", type=int, default=10, help="every Nth login per worker uses a wrong password (0 = never)")
+    ap.add_argument("--attackers", type=int, default=2, help="extra workers that only send wrong passwords")
+    args = ap.parse_args()
+
+    base_url = args.base_url or start_in_process()
+    result = run(base_url, args.duration, args.concurrency, args.users, args.fail_every, args.attackers)
+
+    if not args.base_url:
+        from app.services.demo_auth_store import MemoryAuthStore, get_auth_store
+
+        store = get_auth_store()
+        if isinstance(store, MemoryAuthStore):
+            result["store"] = {"users": len(store._users), "tokens": len(store._tokens), "rate_keys": len(store._attempts)}
+
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
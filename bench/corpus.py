@@ -0,0 +1,117 @@
+"""
+Synthetic requirement corpora for benchmarks: Markdown PRDs, OpenAPI specs and PDFs, at a chosen size.
+
+Content is generated from a fixed seed, so a given (kinds, docs, size) always yields the same bytes.
+"""
+from __future__ import annotations
+
+import json
+import random
+
+import yaml
+
+RESOURCES = ["user", "profile", "session", "order", "invoice", "project", "document", "report", "team", "webhook"]
+VERBS = ["create", "update", "delete", "list", "view", "export", "archive", "restore", "share", "approve"]
+RULES = [
+    "must be at least 8 characters",
+    "must be a valid email address",
+    "returns 401 when the token is missing or invalid",
+    "is rate limited to 5 attempts per minute per IP",
+    "returns 404 when the resource does not exist",
+    "returns 409 when the resource already exists",
+    "must be idempotent for repeated requests",
+    "requires the admin role",
+]
+
+
+def _sentence(rng: random.Random) -> str:
+    r, v, rule = rng.choice(RESOURCES), rng.choice(VERBS), rng.choice(RULES)
+    return f"Users can {v} a {r}; the {r} {v} endpoint {rule}."
+
+
+def _paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def markdown_prd(rng: random.Random, sections: int) -> str:
+    out = [f"# Product Requirements {rng.randint(1000, 9999)}", "", _paragraph(rng), ""]
+    for s in range(sections):
+        r = RESOURCES[s % len(RESOURCES)]
+        out += [f"## {r.title()} management", "", _paragraph(rng), ""]
+        out += [f"### Validation rules for {r}", ""]
+        out += [f"- The {r} {rule}." for rule in rng.sample(RULES, 4)]
+        out += ["", f"| Field | Rule |", "| --- | --- |"]
+        out += [f"| {r}_{i} | {rng.choice(RULES)} |" for i in range(3)]
+        out += [""]
+    return "\n".join(out)
+
+
+def openapi_spec(rng: random.Random, paths: int) -> str:
+    spec = {"openapi": "3.0.3", "info": {"title": "Synthetic API", "version": "1.0.0"}, "paths": {}}
+    for i in range(paths):
+        r = RESOURCES[i % len(RESOURCES)]
+        spec["paths"][f"/{r}s/{i}/{{id}}"] = {
+            "get": {"summary": f"View {r}", "description": _sentence(rng), "responses": {"200": {"description": "OK"}, "404": {"description": "Not found"}}},
+            "patch": {"summary": f"Update {r}", "description": _sentence(rng), "responses": {"200": {"description": "OK"}, "401": {"description": "Unauthorized"}}},
+        }
+    return yaml.safe_dump(spec, sort_keys=False)
+
+
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def pdf_document(rng: random.Random, pages: int, lines_per_page: int = 40) -> bytes:
+    """Minimal valid PDF (Helvetica text, one content stream per page) that pypdf can extract."""
+    objects: list[bytes] = []
+    page_ids = [4 + 2 * p for p in range(pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for p in range(pages):
+        lines = [f"Page {p + 1}"] + [_sentence(rng) for _ in range(lines_per_page)]
+        text = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in lines) + " ET"
+        stream = text.encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {page_ids[p] + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def generate_corpus(docs: int, size: int, kinds: list[str], seed: int = 42) -> list[tuple[str, str, bytes]]:
+    """
+    Returns (filename, content_type, bytes) per document, cycling through `kinds` ("md", "openapi", "pdf").
+    `size` scales every kind: Markdown sections, OpenAPI paths, PDF pages.
+    """
+    rng = random.Random(seed)
+    out = []
+    for i in range(docs):
+        kind = kinds[i % len(kinds)]
+        if kind == "md":
+            out.append((f"prd_{i}.md", "text/markdown", markdown_prd(rng, size).encode("utf-8")))
+        elif kind == "openapi":
+            out.append((f"openapi_{i}.yaml", "application/yaml", openapi_spec(rng, size).encode("utf-8")))
+        elif kind == "pdf":
+            out.append((f"spec_{i}.pdf", "application/pdf", pdf_document(rng, max(1, size // 2))))
+        else:
+            raise ValueError(f"Unknown corpus kind: {kind}")
+    return out
+
+
+if __name__ == "__main__":
+    for name, ct, data in generate_corpus(3, 4, ["md", "openapi", "pdf"]):
+        print(json.dumps({"filename": name, "content_type": ct, "bytes": len(data)}))
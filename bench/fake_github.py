@@ -0,0 +1,159 @@
+"""
+Local fake of the GitHub Actions endpoints used by the CI dispatcher, for exercising coalescing and
+ETag-conditional status polling without touching GitHub.
+
+    python bench/fake_github.py --port 8090 --run-seconds 20
+    GH_API_URL=http://localhost:8090 GH_WORKFLOW_TOKEN=x GH_REPO_OWNER=o GH_REPO_NAME=r uvicorn app.main:app
+    curl localhost:8090/_stats    # dispatches, requests, 304s
+
+Runs move queued -> in_progress -> completed(success) over --run-seconds.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_DISPATCH = re.compile(r"^/repos/([^/]+)/([^/]+)/actions/workflows/([^/]+)/dispatches$")
+_RUNS = re.compile(r"^/repos/([^/]+)/([^/]+)/actions/workflows/([^/]+)/runs$")
+_RUN = re.compile(r"^/repos/([^/]+)/([^/]+)/actions/runs/(\d+)$")
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeGitHub:
+    def __init__(self, run_seconds: float = 20.0, latency_s: float = 0.0):
+        self.run_seconds = run_seconds
+        self.latency_s = latency_s
+        self.runs: list[dict] = []
+        self.stats = {"dispatches": 0, "requests": 0, "not_modified": 0}
+        self._lock = threading.Lock()
+
+    def _view(self, run: dict) -> dict:
+        age = time.time() - run["created"]
+        if age < 1:
+            status, conclusion = "queued", None
+        elif age < self.run_seconds:
+            status, conclusion = "in_progress", None
+        else:
+            status, conclusion = "completed", "success"
+        return {
+            "id": run["id"],
+            "status": status,
+            "conclusion": conclusion,
+            "head_branch": run["ref"],
+            "event": "workflow_dispatch",
+            "display_title": run["title"],
+            "html_url": f"https://github.com/{run['owner']}/{run['repo']}/actions/runs/{run['id']}",
+            "created_at": _iso(run["created"]),
+            "updated_at": _iso(min(time.time(), run["created"] + self.run_seconds)),
+        }
+
+    def dispatch(self, owner: str, repo: str, workflow: str, ref: str, inputs: dict | None = None) -> None:
+        # Same run-name expression as .github/workflows/playwright-api-tests.yml.
+        dispatch_id = (inputs or {}).get("dispatch_id")
+        title = f"Playwright API Tests [{dispatch_id}]" if dispatch_id else "Playwright API Tests"
+        with self._lock:
+            self.stats["dispatches"] += 1
+            self.runs.append({
+                "id": 1000 + len(self.runs), "owner": owner, "repo": repo, "workflow": workflow,
+                "ref": ref, "title": title, "created": time.time(),
+            })
+
+    def list_runs(self, owner: str, repo: str, workflow: str, branch: str | None, per_page: int = 30) -> dict:
+        runs = [
+            self._view(r) for r in reversed(self.runs)
+            if (r["owner"], r["repo"], r["workflow"]) == (owner, repo, workflow) and (not branch or r["ref"] == branch)
+        ]
+        return {"total_count": len(runs), "workflow_runs": runs[:per_page]}
+
+    def get_run(self, run_id: int) -> dict | None:
+        for r in self.runs:
+            if r["id"] == run_id:
+                return self._view(r)
+        return None
+
+
+def _handler(gh: FakeGitHub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body: dict | None = None) -> None:
+            payload = json.dumps(body).encode("utf-8") if body is not None else b""
+            etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+            if status == 200 and self.headers.get("if-none-match") == etag:
+                with gh._lock:
+                    gh.stats["not_modified"] += 1
+                status, payload = 304, b""
+            self.send_response(status)
+            if body is not None:
+                self.send_header("content-type", "application/json")
+                self.send_header("etag", etag)
+            self.send_header("content-length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _begin(self) -> str:
+            with gh._lock:
+                gh.stats["requests"] += 1
+            time.sleep(gh.latency_s)
+            return self.path.split("?", 1)[0]
+
+        def do_POST(self):
+            path = self._begin()
+            body = json.loads(self.rfile.read(int(self.headers.get("content-length") or 0)) or b"{}")
+            m = _DISPATCH.match(path)
+            if not m:
+                return self._reply(404, {"message": "Not Found"})
+            gh.dispatch(*m.groups(), ref=body.get("ref", "main"), inputs=body.get("inputs"))
+            self._reply(204)
+
+        def do_GET(self):
+            path = self._begin()
+            query = dict(p.split("=", 1) for p in self.path.partition("?")[2].split("&") if "=" in p)
+            if path == "/_stats":
+                return self._reply(200, dict(gh.stats))
+            if m := _RUNS.match(path):
+                return self._reply(
+                    200, gh.list_runs(*m.groups(), branch=query.get("branch"), per_page=int(query.get("per_page", 30)))
+                )
+            if m := _RUN.match(path):
+                run = gh.get_run(int(m.group(3)))
+                return self._reply(200, run) if run else self._reply(404, {"message": "Not Found"})
+            self._reply(404, {"message": "Not Found"})
+
+    return Handler
+
+
+def start_server(gh: FakeGitHub, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _handler(gh))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--run-seconds", type=float, default=20.0)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    args = ap.parse_args()
+
+    gh = FakeGitHub(args.run_seconds, args.latency_ms / 1000)
+    server = ThreadingHTTPServer((args.host, args.port), _handler(gh))
+    print(f"fake GitHub API listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Local, deterministic stand-in for the OpenAI API (only what the app calls).
+
+- POST /v1/embeddings: hashed bag-of-words vectors, so similar texts get similar embeddings and
+  pgvector search still returns sensible neighbours. Honours encoding_format=base64 (the SDK default).
+- POST /v1/responses: a canned test plan (demo/test_plan.json by default) whose `sources` cite the
+  chunk ids found in the prompt.
+
+Latency per call is configurable so benchmarks can model a slow upstream.
+
+    python bench/fake_openai.py --port 8089 --embed-latency-ms 20 --response-latency-ms 800
+    OPENAI_BASE_URL=http://localhost:8089/v1 OPENAI_API_KEY=fake ...
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import re
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_PLAN = Path(__file__).resolve().parent.parent / "demo" / "test_plan.json"
+_CHUNK_RE = re.compile(r"Chunk ([0-9a-fA-F-]{36})")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def embed(text: str, dim: int) -> list[float]:
+    vec = [0.0] * dim
+    for word in _WORD_RE.findall(text.lower()):
+        h = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        i = int.from_bytes(h[:4], "little") % dim
+        vec[i] += 1.0 if h[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec))
+    if norm == 0:
+        vec[0], norm = 1.0, 1.0
+    return [v / norm for v in vec]
+
+
+def _tokens(text: str) -> int:
+    # Rough: ~4 chars per token, good enough for usage accounting.
+    return max(1, len(text) // 4)
+
+
+class FakeOpenAI:
+    def __init__(self, dim: int = 1536, embed_latency_s: float = 0.0, response_latency_s: float = 0.0,
+                 plan_path: Path = DEFAULT_PLAN):
+        self.dim = dim
+        self.embed_latency_s = embed_latency_s
+        self.response_latency_s = response_latency_s
+        data = json.loads(Path(plan_path).read_text(encoding="utf-8"))
+        self.plan = data.get("plan", data)
+        self.calls = {"embeddings": 0, "responses": 0}
+        self._lock = threading.Lock()
+
+    def embeddings(self, body: dict) -> dict:
+        inputs = body.get("input")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dim = int(body.get("dimensions") or self.dim)
+        b64 = body.get("encoding_format") == "base64"
+        time.sleep(self.embed_latency_s)
+        data = []
+        for i, text in enumerate(inputs):
+            vec = embed(str(text), dim)
+            emb = base64.b64encode(struct.pack(f"<{dim}f", *vec)).decode("ascii") if b64 else vec
+            data.append({"object": "embedding", "index": i, "embedding": emb})
+        n = sum(_tokens(str(t)) for t in inputs)
+        with self._lock:
+            self.calls["embeddings"] += 1
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model"),
+            "usage": {"prompt_tokens": n, "total_tokens": n},
+        }
+
+    def responses(self, body: dict) -> dict:
+        prompt = body.get("input")
+        prompt = prompt if isinstance(prompt, str) else json.dumps(prompt)
+        time.sleep(self.response_latency_s)
+
+        chunk_ids = _CHUNK_RE.findall(prompt) or ["00000000-0000-0000-0000-000000000000"]
+        tests = []
+        for i, t in enumerate(self.plan.get("tests") or []):
+            t = dict(t)
+            t["sources"] = [f"Chunk {chunk_ids[i % len(chunk_ids)]}"]
+            tests.append(t)
+        text = json.dumps({"project_overview": self.plan.get("project_overview", ""), "tests": tests})
+
+        with self._lock:
+            self.calls["responses"] += 1
+        n_in, n_out = _tokens(prompt), _tokens(text)
+        return {
+            "id": f"resp_fake_{self.calls['responses']}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model"),
+            "status": "completed",
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [
+                {
+                    "type": "message",
+                    "id": "msg_fake",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }
+            ],
+            "usage": {
+                "input_tokens": n_in,
+                "output_tokens": n_out,
+                "total_tokens": n_in + n_out,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens_details": {"reasoning_tokens": 0},
+            },
+        }
+
+
+def _handler(fake: FakeOpenAI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("content-length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            path = self.path.split("?", 1)[0].rstrip("/")
+            if path.endswith("/embeddings"):
+                out, status = fake.embeddings(body), 200
+            elif path.endswith("/responses"):
+                out, status = fake.responses(body), 200
+            else:
+                out, status = {"error": {"message": f"unknown path {self.path}"}}, 404
+            payload = json.dumps(out).encode("utf-8")
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def start_server(fake: FakeOpenAI, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve in a daemon thread; port 0 picks a free port (see server.server_address)."""
+    server = ThreadingHTTPServer((host, port), _handler(fake))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--dim", type=int, default=1536)
+    ap.add_argument("--embed-latency-ms", type=float, default=0.0)
+    ap.add_argument("--response-latency-ms", type=float, default=0.0)
+    ap.add_argument("--plan", type=Path, default=DEFAULT_PLAN)
+    args = ap.parse_args()
+
+    fake = FakeOpenAI(args.dim, args.embed_latency_ms / 1000, args.response_latency_ms / 1000, args.plan)
+    server = ThreadingHTTPServer((args.host, args.port), _handler(fake))
+    print(f"fake OpenAI listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Serialization benchmark for the large JSON responses (latest test plan, list pages): the default FastAPI
+path (jsonable_encoder + json.dumps) against app.api.responses (orjson), plus gzip/zstd compression time
+and bytes on the wire, and the cost of serving a cached plan.
+
+No database or Redis needed:
+
+    PYTHONPATH=backend DATABASE_URL=postgresql+psycopg://unused@localhost/x REDIS_URL=redis://localhost:6379/0 \\
+      python bench/serialization.py --tests 2000 --items 1000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+def make_plan(n_tests: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    chunk_ids = [str(uuid.UUID(int=rnd.getrandbits(128))) for _ in range(200)]
+    tests = []
+    for i in range(1, n_tests + 1):
+        tests.append({
+            "id": f"T{i:03d}",
+            "title": f"Verify {rnd.choice(['login', 'orders', 'profile', 'search'])} behaviour case {i}",
+            "type": rnd.choice(["api", "ui", "e2e"]),
+            "priority": rnd.choice(["P0", "P1", "P2"]),
+            "preconditions": ["User exists", "Service is reachable"],
+            "steps": [f"Step {s}: send request with payload variant {rnd.randint(1, 99)}" for s in range(1, 6)],
+            "expected": "Response status and body match the specification; no data is leaked.",
+            "tags": rnd.sample(["auth", "smoke", "regression", "negative", "security", "perf"], 2),
+            "sources": rnd.sample(chunk_ids, 2),
+        })
+    return {
+        "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+        "job_id": str(uuid.UUID(int=rnd.getrandbits(128))),
+        "created_at": datetime(2025, 1, 1),
+        "version": 3,
+        "base_plan_id": None,
+        "diff": {"mode": "full"},
+        "plan": {"summary": "Generated plan", "assumptions": ["Staging environment"], "tests": tests},
+    }
+
+
+def make_items(n: int, seed: int) -> list[dict]:
+    rnd = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "id": uuid.UUID(int=rnd.getrandbits(128)),
+            "filename": f"spec-{i}.yaml",
+            "content_type": "application/yaml",
+            "status": "ready",
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(n)
+    ]
+
+
+def timeit(fn, repeat: int) -> tuple[float, object]:
+    samples = []
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, out
+
+
+def bench_payload(name: str, obj, repeat: int) -> dict:
+    from fastapi.encoders import jsonable_encoder
+
+    from app.api.responses import compress, dumps, zstandard
+
+    # What FastAPI does for a returned dict (JSONResponse renders with json.dumps, compact separators).
+    def default_path() -> bytes:
+        return json.dumps(jsonable_encoder(obj), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    default_ms, default_body = timeit(default_path, repeat)
+    orjson_ms, body = timeit(lambda: dumps(obj), repeat)
+    assert json.loads(body) == json.loads(default_body), f"{name}: orjson output differs from the default path"
+
+    result = {
+        "bytes": len(body),
+        "default_ms": default_ms,
+        "orjson_ms": orjson_ms,
+        "speedup": default_ms / orjson_ms if orjson_ms else None,
+        "encodings": {},
+    }
+    for encoding in ["gzip"] + (["zstd"] if zstandard is not None else []):
+        ms, out = timeit(lambda: compress(body, encoding), repeat)
+        result["encodings"][encoding] = {"bytes": len(out), "ratio": len(body) / len(out), "compress_ms": ms}
+    return result
+
+
+def bench_cached_plan(plan: dict, repeat: int) -> dict:
+    from starlette.requests import Request
+
+    from app.api.responses import cached_json_response
+
+    def request(accept_encoding: str) -> Request:
+        return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+    out = {}
+    for accept in ["identity", "gzip", "zstd"]:
+        key = f"bench-{uuid.uuid4()}"
+        t0 = time.perf_counter()
+        cached_json_response(request(accept), key, lambda: plan)
+        miss_ms = (time.perf_counter() - t0) * 1000
+        hit_ms, resp = timeit(lambda: cached_json_response(request(accept), key, lambda: plan), repeat)
+        out[accept] = {
+            "miss_ms": miss_ms,
+            "hit_ms": hit_ms,
+            "encoding": resp.headers.get("content-encoding"),
+            "bytes": len(resp.body),
+        }
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tests", type=int, default=2000, help="tests in the synthetic plan")
+    ap.add_argument("--items", type=int, default=1000, help="rows in the synthetic list page")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    plan = make_plan(args.tests, args.seed)
+    items = make_items(args.items, args.seed)
+    result = {
+        "config": vars(args),
+        "latest_plan": bench_payload("latest_plan", plan, args.repeat),
+        "list_page": bench_payload("list_page", items, args.repeat),
+        "cached_plan": bench_cached_plan(plan, args.repeat),
+    }
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
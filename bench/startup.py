@@ -0,0 +1,101 @@
+"""
+Cold-start benchmark for the API process: time to import app.main and latency of the first and second
+request, each measured in a fresh interpreter. Also lists which heavy modules the import pulled in
+(the API should load neither pypdf nor the OpenAI SDK nor the Celery task modules).
+
+    PYTHONPATH=backend DATABASE_URL=postgresql+psycopg://unused@localhost/x REDIS_URL=redis://localhost:6379/0 \\
+      python bench/startup.py --runs 10
+    # top imports by cumulative time
+    ... python bench/startup.py --runs 1 --importtime
+
+The default request path needs neither Postgres nor Redis.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["openai", "pypdf", "pgvector", "celery", "app.tasks.ingest_tasks", "app.tasks.plan_tasks", "app.services.test_plan"]
+
+CHILD = """
+import json, sys, time
+from fastapi.testclient import TestClient  # not part of the app's import cost
+
+t0 = time.perf_counter()
+import app.main
+t_import = time.perf_counter() - t0
+
+with TestClient(app.main.app) as client:
+    t0 = time.perf_counter()
+    status = client.get(sys.argv[1]).status_code
+    t_first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    client.get(sys.argv[1])
+    t_second = time.perf_counter() - t0
+
+heavy = [m for m in json.loads(sys.argv[2]) if m in sys.modules]
+print(json.dumps({"import_s": t_import, "first_request_s": t_first, "second_request_s": t_second, "status": status, "loaded": heavy}))
+"""
+
+
+def run_once(path: str, importtime: bool) -> tuple[dict, str]:
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD, path, json.dumps(HEAVY_MODULES)]
+    p = subprocess.run(cmd, capture_output=True, text=True, env=os.environ.copy())
+    if p.returncode != 0:
+        sys.stderr.write(p.stderr)
+        sys.exit(p.returncode)
+    return json.loads(p.stdout.strip().splitlines()[-1]), p.stderr
+
+
+def top_imports(stderr: str, n: int) -> list[tuple[str, float]]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level packages and app modules only; their children are included in the cumulative time.
+        if name.startswith("  ") and not name.strip().startswith("app."):
+            continue
+        rows.append((name.strip(), int(cumulative) / 1000))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:n]
+
+
+def summarize(xs: list[float]) -> dict:
+    return {"min_ms": min(xs) * 1000, "median_ms": statistics.median(xs) * 1000, "max_ms": max(xs) * 1000}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--path", default="/metrics")
+    ap.add_argument("--importtime", action="store_true", help="also report the slowest imports of the last run")
+    args = ap.parse_args()
+
+    runs = []
+    stderr = ""
+    for _ in range(args.runs):
+        r, stderr = run_once(args.path, args.importtime)
+        runs.append(r)
+
+    result = {
+        "runs": args.runs,
+        "path": args.path,
+        "status": runs[-1]["status"],
+        "import": summarize([r["import_s"] for r in runs]),
+        "first_request": summarize([r["first_request_s"] for r in runs]),
+        "second_request": summarize([r["second_request_s"] for r in runs]),
+        "cold_start": summarize([r["import_s"] + r["first_request_s"] for r in runs]),
+        "heavy_modules_loaded": runs[-1]["loaded"],
+    }
+    if args.importtime:
+        result["slowest_imports_ms"] = dict(top_imports(stderr, 15))
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()